@@ -0,0 +1,5 @@
+"""Обработка логов олимпиады: итоговые таблицы, статистика языков, проверка на списывание
+
+Пакет намеренно ничего не импортирует при загрузке: pandas, numpy и matplotlib
+подгружаются только модулями, которым они нужны, чтобы запуск из лаунчера был быстрым.
+"""
@@ -0,0 +1,33 @@
+"""Единая точка входа: python -m olympiad <команда> [аргументы команды]"""
+import sys
+import importlib
+
+# Команда -> (модуль, описание); модуль импортируется только при запуске своей команды
+COMMANDS = {
+    'standings': ('olympiad.standings', 'итоговая таблица олимпиады (CSV/XLSX, --live, --all-slices)'),
+    'languages': ('olympiad.language_report', 'интерактивный отчёт по языкам программирования'),
+    'language-vectors': ('olympiad.language_vectors', 'векторы использования языков участниками'),
+    'plagiarism': ('olympiad.plagiarism', 'поиск подозрительно быстрых изменений решений'),
+    'serve': ('olympiad.server', 'HTTP сервер живой итоговой таблицы'),
+}
+
+
+def print_usage():
+    print("Использование: python -m olympiad <команда> [аргументы]\n")
+    print("Команды:")
+    for command, (module, description) in COMMANDS.items():
+        print(f"  {command:<18} {description}")
+
+
+def run(command, argv=None):
+    """Запуск команды; argv по умолчанию - аргументы командной строки скрипта"""
+    module = importlib.import_module(COMMANDS[command][0])
+    return module.main(sys.argv[1:] if argv is None else argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print_usage()
+        return 2 if argv and argv[0] not in ('-h', '--help') else 0
+    return run(argv[0], argv[1:])
@@ -0,0 +1,258 @@
+import os
+import pandas as pd
+from pathlib import Path
+import numpy as np
+
+from .log_table import find_logs, load_xml_logs, get_best_scores
+from .languages import LANGUAGE_RULES, load_language_rules, language_incidence
+
+
+def create_language_vectors(participants, submissions, df_total,
+                            target_grade=None, target_municipality=None,
+                            min_score=None, max_score=None, top_n=9, language_rules=LANGUAGE_RULES):
+    """Создание бинарных векторов использования языков программирования"""
+    selected = language_incidence(participants, submissions, df_total,
+                                  target_grade, target_municipality, min_score, max_score, top_n, language_rules)
+    if selected is None:
+        return None, None, None
+    df_vectors, top_languages, df_filtered_total = selected
+
+    # Добавляем информацию об участниках
+    df_vectors['Имя'] = df_vectors['user_id'].map(lambda x: participants[x]['name'])
+    df_vectors['Класс'] = df_vectors['user_id'].map(lambda x: participants[x]['grade'])
+    df_vectors['Муниципалитет'] = df_vectors['user_id'].map(lambda x: participants[x]['municipality'])
+
+    # Добавляем общий балл участника: соединение по user_id вместо поиска по всей таблице для каждого
+    total_scores = df_filtered_total.set_index('user_id')['total_score']
+    df_vectors['Общий_балл'] = df_vectors['user_id'].map(total_scores).fillna(0)
+
+    # Переупорядочиваем столбцы
+    column_order = ['Имя', 'Класс', 'Муниципалитет', 'Общий_балл'] + top_languages
+    df_vectors = df_vectors[column_order]
+
+    # Суммируем все векторы (получаем количество УНИКАЛЬНЫХ участников по каждому языку)
+    language_sums = df_vectors[top_languages].sum()
+
+    # Сортируем языки по количеству участников (по убыванию)
+    language_sums = language_sums.sort_values(ascending=False)
+
+    return df_vectors, language_sums, top_languages
+
+
+def visualize_language_vectors(language_sums, total_participants, params, output_file='language_vectors.png'):
+    """Визуализация результатов в виде диаграммы"""
+
+    if language_sums.empty:
+        return None
+
+    # matplotlib загружается только при построении диаграммы - это самый долгий импорт
+    import matplotlib.pyplot as plt
+
+    # Создаем диаграмму
+    plt.figure(figsize=(12, 8))
+
+    # Цвета для столбцов
+    colors = plt.cm.Set3(np.arange(len(language_sums)) / len(language_sums))
+
+    bars = plt.bar(language_sums.index, language_sums.values, color=colors, edgecolor='black')
+
+    # Добавляем значения над столбцами
+    for bar in bars:
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width() / 2., height + 0.5,
+                 f'{int(height)}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+
+    # Настройка графика
+    title = 'Количество участников по языкам программирования\n'
+
+    # Добавляем информацию о фильтрах в заголовок
+    subtitle_parts = []
+    if params['grade']:
+        subtitle_parts.append(f'Класс: {params["grade"]}')
+    if params['municipality']:
+        subtitle_parts.append(f'Муниципалитет: {params["municipality"]}')
+    if params['min_score'] is not None or params['max_score'] is not None:
+        min_score = params['min_score'] if params['min_score'] is not None else 0
+        max_score = params['max_score'] if params['max_score'] is not None else '∞'
+        subtitle_parts.append(f'Баллы: {min_score}-{max_score}')
+
+    if subtitle_parts:
+        title += ' | '.join(subtitle_parts)
+
+    plt.title(title, fontsize=16, fontweight='bold', pad=20)
+    plt.xlabel('Язык программирования', fontsize=12)
+    plt.ylabel('Количество уникальных участников', fontsize=12)
+
+    plt.xticks(rotation=45, ha='right', fontsize=10)
+    plt.grid(axis='y', alpha=0.3, linestyle='--')
+
+
+
+    # Сохраняем диаграмму
+    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+
+    # Показываем диаграмму
+    plt.show()
+
+    return output_file
+
+
+def save_to_csv(df_vectors, language_sums, params, base_filename='language_analysis'):
+    """Сохранение результатов в CSV файлы"""
+
+    if df_vectors is None or df_vectors.empty:
+        return []
+
+    # Создаем основную таблицу с участниками
+    main_csv = f"{base_filename}_participants.csv"
+    df_vectors.to_csv(main_csv, sep=';', index=False, encoding='utf-8-sig')
+
+    # Создаем файл со статистикой по языкам
+    stats_csv = f"{base_filename}_languages.csv"
+    stats_data = []
+    total_participants = len(df_vectors)
+
+    for lang, count in language_sums.items():
+        percentage = (count / total_participants) * 100 if total_participants > 0 else 0
+        stats_data.append({
+            'Язык программирования': lang,
+            'Количество участников': int(count),
+            'Доля участников (%)': round(percentage, 2)
+        })
+
+    df_stats = pd.DataFrame(stats_data)
+    df_stats.to_csv(stats_csv, sep=';', index=False, encoding='utf-8-sig')
+
+    # Создаем файл с параметрами анализа
+    params_csv = f"{base_filename}_params.csv"
+    params_data = [{
+        'Параметр': 'Класс',
+        'Значение': params['grade'] if params['grade'] else 'Все'
+    }, {
+        'Параметр': 'Муниципалитет',
+        'Значение': params['municipality'] if params['municipality'] else 'Все'
+    }, {
+        'Параметр': 'Минимальный балл',
+        'Значение': params['min_score'] if params['min_score'] is not None else 'Любой'
+    }, {
+        'Параметр': 'Максимальный балл',
+        'Значение': params['max_score'] if params['max_score'] is not None else 'Любой'
+    }, {
+        'Параметр': 'Топ языков',
+        'Значение': params['top_n']
+    }, {
+        'Параметр': 'Всего участников',
+        'Значение': total_participants
+    }, {
+        'Параметр': 'Языков проанализировано',
+        'Значение': len(language_sums)
+    }, {
+        'Параметр': 'Сумма элементов векторов',
+        'Значение': int(language_sums.sum())
+    }]
+
+    df_params = pd.DataFrame(params_data)
+    df_params.to_csv(params_csv, sep=';', index=False, encoding='utf-8-sig')
+
+    return [main_csv, stats_csv, params_csv]
+
+
+def get_user_input(source='log.xml'):
+    """Получение параметров от пользователя"""
+    # Проверяем существование файла
+    if not find_logs(source):
+        print(f"Ошибка: Файл {source} не найден.")
+        return None
+
+    # Запрашиваем класс
+    grade_input = input("Введите номер класса (9, 10, 11) или Enter для всех классов: ").strip()
+    grade = int(grade_input) if grade_input.isdigit() else None
+
+    # Запрашиваем муниципалитет
+    municipality = input("Введите муниципалитет или Enter для всех: ").strip()
+    municipality = municipality if municipality else None
+
+    # Запрашиваем диапазон баллов
+    print("\nДиапазон баллов участников:")
+    min_score_input = input("Минимальный балл (или Enter для любого): ").strip()
+    max_score_input = input("Максимальный балл (или Enter для любого): ").strip()
+
+    min_score = float(min_score_input) if min_score_input.replace('.', '', 1).isdigit() else None
+    max_score = float(max_score_input) if max_score_input.replace('.', '', 1).isdigit() else None
+
+    # Запрашиваем количество языков для анализа
+    top_n_input = input("\nСколько топ языков анализировать (по умолчанию 9): ").strip()
+    top_n = int(top_n_input) if top_n_input.isdigit() else 9
+
+    # Запрашиваем префикс для файлов
+    output_prefix = input("\nВведите префикс для выходных файлов (по умолчанию 'analysis'): ").strip()
+    if not output_prefix:
+        output_prefix = 'analysis'
+
+    # Собираем параметры
+    params = {
+        'grade': grade,
+        'municipality': municipality,
+        'min_score': min_score,
+        'max_score': max_score,
+        'top_n': top_n,
+        'output_prefix': output_prefix
+    }
+
+    return params
+
+
+def main(argv=None):
+    """Интерактивный отчёт: параметры вводятся с клавиатуры; первый аргумент argv - лог, папка
+    с логами или шаблон (tour*.xml), по умолчанию log.xml"""
+    source = argv[0] if argv else 'log.xml'
+
+    # Получаем параметры от пользователя
+    params = get_user_input(source)
+    if params is None:
+        return
+
+    try:
+        # Парсим XML (несколько логов объединяются в один набор данных)
+        participants, submissions = load_xml_logs(source, workers=os.cpu_count() or 1)
+
+        # Свои правила нормализации языков можно положить рядом в languages.json
+        language_rules = load_language_rules('languages.json') if Path('languages.json').exists() else LANGUAGE_RULES
+
+        # Получаем лучшие баллы участников
+        df_total = get_best_scores(participants, submissions)
+
+        # Создаем векторы языков
+        result = create_language_vectors(
+            participants=participants,
+            submissions=submissions,
+            df_total=df_total,
+            target_grade=params['grade'],
+            target_municipality=params['municipality'],
+            min_score=params['min_score'],
+            max_score=params['max_score'],
+            top_n=params['top_n'],
+            language_rules=language_rules
+        )
+
+        if result[0] is None:
+            print("Нет данных для выбранных критериев фильтрации.")
+            return
+
+        df_vectors, language_sums, top_languages = result
+
+        total_participants = len(df_vectors)
+
+        # Сохраняем в CSV
+        csv_files = save_to_csv(df_vectors, language_sums, params, params['output_prefix'])
+
+        # Создаем диаграмму
+        diagram_file = f"{params['output_prefix']}_diagram.png"
+        visualize_language_vectors(language_sums, total_participants, params, diagram_file)
+
+    except Exception as e:
+        print(f"Произошла ошибка: {e}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,178 @@
+import argparse
+import numpy as np
+
+from .xml_log import available_xml_backends
+from .log_table import find_logs, load_xml_logs, get_best_scores
+from .languages import LANGUAGE_RULES, load_language_rules, language_incidence
+
+
+def create_language_vectors(participants, submissions, df_total,
+                            target_grade=None, target_municipality=None,
+                            min_score=None, max_score=None, top_n=9, language_rules=LANGUAGE_RULES):
+    """Создание бинарных векторов использования языков программирования"""
+    selected = language_incidence(participants, submissions, df_total,
+                                  target_grade, target_municipality, min_score, max_score, top_n, language_rules)
+    if selected is None:
+        print("Нет данных для выбранных критериев фильтрации.")
+        return None, None, None
+    df_vectors, top_languages, _ = selected
+
+    # Создаем словарь для быстрого доступа по индексу
+    lang_to_index = {lang: idx for idx, lang in enumerate(top_languages)}
+
+    # Добавляем информацию об участниках
+    df_vectors['name'] = df_vectors['user_id'].map(lambda x: participants[x]['name'])
+    df_vectors['grade'] = df_vectors['user_id'].map(lambda x: participants[x]['grade'])
+    df_vectors['municipality'] = df_vectors['user_id'].map(lambda x: participants[x]['municipality'])
+
+    # Суммируем все векторы (получаем количество УНИКАЛЬНЫХ участников по каждому языку)
+    language_sums = df_vectors[top_languages].sum()
+
+    # Сортируем языки по количеству участников (по убыванию)
+    language_sums = language_sums.sort_values(ascending=False)
+
+    return df_vectors, language_sums, lang_to_index
+
+
+def visualize_language_vectors(language_sums, total_participants, output_file='language_vectors.png'):
+    """Визуализация результатов в виде диаграммы"""
+
+    if language_sums.empty:
+        print("Нет данных для визуализации.")
+        return None
+
+    # matplotlib загружается только при построении диаграммы - это самый долгий импорт
+    import matplotlib.pyplot as plt
+
+    # Создаем диаграмму
+    plt.figure(figsize=(12, 8))
+
+    # Цвета для столбцов
+    colors = plt.cm.Set3(np.arange(len(language_sums)) / len(language_sums))
+
+    bars = plt.bar(language_sums.index, language_sums.values, color=colors, edgecolor='black')
+
+    # Добавляем значения над столбцами
+    for bar in bars:
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width() / 2., height + 0.5,
+                 f'{int(height)}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+
+    # Настройка графика
+    plt.title('Количество участников по языкам программирования', fontsize=16, fontweight='bold', pad=20)
+    plt.xlabel('Язык программирования', fontsize=12)
+    plt.ylabel('Количество уникальных участников', fontsize=12)
+
+    plt.xticks(rotation=45, ha='right', fontsize=10)
+    plt.grid(axis='y', alpha=0.3, linestyle='--')
+
+    # Добавляем информацию
+
+    plt.tight_layout()
+
+    # Сохраняем диаграмму
+    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+
+    # Показываем диаграмму
+    plt.show()
+
+    return language_sums
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Анализ использования языков программирования с векторами')
+    parser.add_argument('--xml', default='log.xml',
+                        help='Путь к XML файлу с логами (можно сжатому: .gz, .bz2, .xz, .zst), '
+                             'папке с логами или шаблону (tour*.xml) - логи объединяются')
+    parser.add_argument('--output', default='language_vectors.png', help='Путь для сохранения диаграммы')
+    parser.add_argument('--grade', help='Фильтр по классу (например: 9, 10, 11)')
+    parser.add_argument('--municipality', help='Фильтр по муниципалитету')
+    parser.add_argument('--no-cache', action='store_true', help='Не использовать кэш разобранного XML')
+    parser.add_argument('--parser', choices=available_xml_backends(),
+                        help='Бэкенд разбора XML (по умолчанию самый быстрый из доступных)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Число процессов для разбора XML (по логу на процесс, '
+                             'а у единственного лога раздел events делится на куски)')
+    parser.add_argument('--min-score', type=float, help='Минимальный балл участника')
+    parser.add_argument('--max-score', type=float, help='Максимальный балл участника')
+    parser.add_argument('--csv-output', default='language_vectors.csv', help='Путь для сохранения CSV с векторами')
+    parser.add_argument('--show-vectors', action='store_true', help='Показать векторы участников')
+    parser.add_argument('--top-n', type=int, default=9, help='Количество топ языков для анализа (по умолчанию: 9)')
+    parser.add_argument('--languages', help='JSON файл с правилами нормализации языков {"Язык": ["подстрока", ...]}')
+
+    args = parser.parse_args(argv)
+
+    # Проверяем существование файла
+    if not find_logs(args.xml):
+        print(f"Файл {args.xml} не найден.")
+        return
+
+
+    try:
+        # Парсим XML
+        participants, submissions = load_xml_logs(args.xml, use_cache=not args.no_cache,
+                                                  backend=args.parser, workers=args.workers)
+
+        # Получаем лучшие баллы участников
+        df_total = get_best_scores(participants, submissions)
+
+        # Создаем векторы языков
+        df_vectors, language_sums, lang_to_index = create_language_vectors(
+            participants=participants,
+            submissions=submissions,
+            df_total=df_total,
+            target_grade=args.grade,
+            target_municipality=args.municipality,
+            min_score=args.min_score,
+            max_score=args.max_score,
+            top_n=args.top_n,
+            language_rules=load_language_rules(args.languages) if args.languages else LANGUAGE_RULES
+        )
+
+        if df_vectors is None:
+            print("Не удалось создать векторы. Проверьте критерии фильтрации.")
+            return
+
+        # Выводим информацию о векторах
+        total_participants = len(df_vectors)
+
+        # Создаем визуализацию
+        if not language_sums.empty:
+            # Визуализируем
+            result = visualize_language_vectors(language_sums, total_participants, args.output)
+
+
+            for lang, count in language_sums.items():
+                percentage = (count / total_participants) * 100
+
+            # Суммируем все векторы
+            sum_vector = language_sums.values
+
+
+            # Показываем пример вектора
+
+            for i, (_, row) in enumerate(df_vectors.head().iterrows()):
+                vector = [row[lang] for lang in language_sums.index]
+                vector_str = ''.join(str(int(v)) for v in vector)
+
+
+            # Статистика по количеству языков на участника
+
+            df_vectors['num_languages'] = df_vectors[language_sums.index].sum(axis=1)
+            lang_stats = df_vectors['num_languages'].value_counts().sort_index()
+
+            for num_langs, count in lang_stats.items():
+                percentage = (count / total_participants) * 100
+
+
+        # Сохраняем векторы в CSV
+        df_vectors.to_csv(args.csv_output, sep=';', index=False, encoding='utf-8-sig')
+
+    except Exception as e:
+        print(f"Произошла ошибка: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""Нормализация languageId: объединение компиляторов одного языка"""
+import json
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# Правила объединения компиляторов одного языка: (язык, подстроки в languageId).
+# Проверяются по порядку, срабатывает первое совпадение (на основе предоставленного XML)
+LANGUAGE_RULES = (
+    ('Python', ('python', 'pypy')),
+    ('C++', ('cpp', 'c++')),
+    ('C#', ('c#', 'csharp', 'dotnet')),
+    ('Java', ('java', 'jdk')),
+    ('Pascal', ('pascal', 'delphi', 'fpc', 'dcc')),
+    ('Go', ('go', 'golang')),
+    ('Rust', ('rust',)),
+    ('Kotlin', ('kotlin',)),
+    ('Haskell', ('haskell',)),
+)
+
+
+def load_language_rules(path):
+    """Правила нормализации из JSON файла вида {"Python": ["python", "pypy"], ...} (порядок важен)"""
+    with open(path, encoding='utf-8') as f:
+        rules = json.load(f)
+    return tuple(
+        (language, tuple(str(pattern).lower() for pattern in patterns))
+        for language, patterns in rules.items()
+    )
+
+
+@lru_cache(maxsize=None)
+def normalize_language(language_id, rules=LANGUAGE_RULES):
+    """Нормализация языков программирования - объединение компиляторов одного языка"""
+    language_id = str(language_id).lower()
+
+    for language, patterns in rules:
+        if any(pattern in language_id for pattern in patterns):
+            return language
+
+    # Возвращаем оригинальное название для неизвестных языков
+    return language_id.split('_')[0].upper() if '_' in language_id else language_id.upper()
+
+
+def normalize_languages(language_ids, rules=LANGUAGE_RULES):
+    """Нормализация категориального столбца languageId: правила применяются один раз на каждое значение"""
+    # Последний элемент - для отправок без languageId (код -1)
+    names = [normalize_language(language_id, rules) for language_id in language_ids.cat.categories]
+    names.append(normalize_language(None, rules))
+
+    languages = list(dict.fromkeys(names))
+    language_codes = {language: code for code, language in enumerate(languages)}
+    remap = np.array([language_codes[name] for name in names], dtype=np.intc)
+
+    return pd.Series(
+        pd.Categorical.from_codes(remap[language_ids.cat.codes.to_numpy()], categories=languages),
+        index=language_ids.index
+    )
+
+
+def language_incidence(participants, submissions, df_total,
+                       target_grade=None, target_municipality=None,
+                       min_score=None, max_score=None, top_n=9, language_rules=LANGUAGE_RULES):
+    """Бинарные векторы использования топ-N языков участниками, прошедшими фильтры
+
+    Возвращает (векторы: user_id + столбец 0/1 на каждый топ-язык, топ-языки, баллы выбранных участников)
+    или None, если у выбранных участников нет отправок.
+    """
+    # Фильтрация участников по классу и муниципалитету
+    filtered_participants = {
+        uid for uid, data in participants.items()
+        if (target_grade is None or str(data['grade']) == str(target_grade))
+        and (target_municipality is None or data['municipality'] == target_municipality)
+    }
+
+    # Получаем данные о баллах для отфильтрованных участников
+    df_filtered_total = df_total[df_total['user_id'].isin(filtered_participants)]
+
+    # Фильтрация по диапазону баллов
+    if min_score is not None:
+        df_filtered_total = df_filtered_total[df_filtered_total['total_score'] >= min_score]
+    if max_score is not None:
+        df_filtered_total = df_filtered_total[df_filtered_total['total_score'] <= max_score]
+
+    # Фильтруем отправки только от выбранных участников
+    df_filtered = submissions[submissions['user_id'].isin(set(df_filtered_total['user_id'].tolist()))]
+
+    if df_filtered.empty:
+        return None
+
+    # Нормализуем языки по различным значениям languageId, а не по каждой отправке
+    languages = normalize_languages(df_filtered['language_id'], language_rules)
+    user_codes = df_filtered['user_id'].cat.codes.to_numpy()
+    language_codes = languages.cat.codes.to_numpy()
+
+    # Участники в порядке первой отправки
+    _, first_submit = np.unique(user_codes, return_index=True)
+    user_order = user_codes[np.sort(first_submit)]
+    user_rows = np.empty(len(df_filtered['user_id'].cat.categories), dtype=np.intp)
+    user_rows[user_order] = np.arange(len(user_order))
+
+    # Матрица участник × язык: 1, если участник хоть раз сдавал на этом языке (повторы схлопываются)
+    incidence = np.zeros((len(user_order), len(languages.cat.categories)), dtype=np.uint8)
+    incidence[user_rows[user_codes], language_codes] = 1
+
+    # Количество УНИКАЛЬНЫХ участников по языку - сумма столбца;
+    # при равенстве раньше идёт язык, который раньше встретился в отправках
+    language_counts = incidence.sum(axis=0)
+    _, first_use = np.unique(language_codes, return_index=True)
+    used_languages = language_codes[np.sort(first_use)]
+    ranked = used_languages[np.argsort(-language_counts[used_languages].astype(np.int64), kind='stable')]
+
+    # Выбираем топ-N языков (по количеству УНИКАЛЬНЫХ участников)
+    top_codes = ranked[:top_n]
+    top_languages = [languages.cat.categories[code] for code in top_codes]
+
+    # Бинарные векторы - столбцы топ-языков из матрицы
+    df_vectors = pd.DataFrame(incidence[:, top_codes], columns=top_languages)
+    df_vectors.insert(0, 'user_id', np.asarray(df_filtered['user_id'].cat.categories, dtype=object)[user_order])
+
+    return df_vectors, top_languages, df_filtered_total
@@ -0,0 +1,383 @@
+"""Таблица отправок в памяти: разбор лога в категориальные столбцы и кэш разобранного лога"""
+import os
+import glob
+import hashlib
+import tempfile
+import contextlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .xml_log import iter_xml_log, split_events, iter_events_chunk, iter_outside_events
+
+
+def intern_code(categories, value):
+    """Код значения в словаре категорий (новые значения получают следующий номер, None - код -1)"""
+    if value is None:
+        return -1
+    code = categories.get(value)
+    if code is None:
+        code = categories[value] = len(categories)
+    return code
+
+
+def category_index(values):
+    """Словарь категорий с явным типом object: у пустого словаря тот же тип, что и у непустого,
+    иначе union_categoricals не объединит лог без отправок (или без languageId) с остальными"""
+    return pd.Index(list(values), dtype=object)
+
+
+def make_categorical(codes, categories):
+    """Категориальный столбец из массива кодов без копирования строк"""
+    return pd.Categorical.from_codes(np.frombuffer(codes, dtype=np.intc), categories=category_index(categories))
+
+
+def collect_submissions(records):
+    """Столбцы отправок из записей (user_id, задача, languageId, баллы): словари категорий, коды и баллы"""
+    # Таблица отправок хранится по столбцам: коды участника, задачи и языка плюс баллы float64
+    # (float32 искажает дробные баллы: 467.6 превращается в 467.59998, и равные суммы получают разные места)
+    user_ids, problems, languages = {}, {}, {}
+    user_column, problem_column, language_column = array('i'), array('i'), array('i')
+    score_column = array('d')
+
+    for user_id, problem_title, language_id, score in records:
+        user_column.append(intern_code(user_ids, user_id))
+        problem_column.append(intern_code(problems, problem_title))
+        language_column.append(intern_code(languages, language_id))
+        score_column.append(score)
+
+    return (user_ids, problems, languages), (user_column, problem_column, language_column), score_column
+
+
+def submissions_frame(categories, codes, scores):
+    """Таблица отправок из словарей категорий и массивов кодов"""
+    user_ids, problems, languages = categories
+    user_column, problem_column, language_column = codes
+    return pd.DataFrame({
+        'user_id': make_categorical(user_column, user_ids),
+        'problem': make_categorical(problem_column, problems),
+        'language_id': make_categorical(language_column, languages),
+        'score': np.frombuffer(scores, dtype=np.float64)
+    })
+
+
+def parse_xml_log(xml_path, backend=None, workers=1):
+    """Парсинг XML файла и извлечение данных (backend - бэкенд разбора XML, по умолчанию самый быстрый;
+    workers > 1 - разбор раздела events кусками в нескольких процессах)"""
+    if workers > 1:
+        layout = split_events(xml_path, workers)
+        if layout is not None:
+            return parse_xml_log_parallel(xml_path, layout, backend)
+
+    participants = {}
+
+    def submits():
+        for kind, record in iter_xml_log(xml_path, backend):
+            if kind == 'user':
+                uid, data = record
+                participants[uid] = data
+            else:
+                yield record
+
+    return participants, submissions_frame(*collect_submissions(submits()))
+
+
+def parse_events_chunk(xml_path, declaration, start, end, backend=None):
+    """Столбцы отправок куска раздела events (выполняется в процессе-обработчике)"""
+    categories, codes, scores = collect_submissions(
+        record for kind, record in iter_events_chunk(xml_path, declaration, start, end, backend)
+    )
+    # В родительский процесс передаём словари категорий списками: порядок задаёт коды
+    return [list(mapping) for mapping in categories], codes, scores
+
+
+def merge_submission_columns(partials):
+    """Склейка столбцов кусков по порядку: локальные коды каждого куска перекодируются в общие"""
+    categories = ({}, {}, {})
+    columns = ([], [], [])
+    scores = []
+
+    for part_categories, part_codes, part_scores in partials:
+        for mapping, values, codes, column in zip(categories, part_categories, part_codes, columns):
+            # Код -1 (нет значения) в конце таблицы перекодировки: индекс -1 даёт снова -1
+            recode = np.array([intern_code(mapping, value) for value in values] + [-1], dtype=np.intc)
+            column.append(recode[np.frombuffer(codes, dtype=np.intc)])
+        scores.append(np.frombuffer(part_scores, dtype=np.float64))
+
+    return categories, [np.concatenate(column) for column in columns], np.concatenate(scores)
+
+
+def parse_xml_log_parallel(xml_path, layout, backend=None):
+    """Параллельный разбор: куски раздела events - в процессах-обработчиках, остальное - здесь"""
+    declaration, outside, chunks = layout
+
+    with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+        futures = [executor.submit(parse_events_chunk, xml_path, declaration, start, end, backend)
+                   for start, end in chunks]
+
+        # Пока обработчики разбирают отправки, читаем участников из начала и хвоста файла
+        participants = {}
+        tail = []
+        for kind, record in iter_outside_events(xml_path, outside, backend):
+            if kind == 'user':
+                uid, data = record
+                participants[uid] = data
+            else:
+                tail.append(record)
+
+        partials = [future.result() for future in futures]
+
+    # Отправки других разделов events (если они есть) идут в файле после первого
+    categories, codes, scores = collect_submissions(tail)
+    partials.append(([list(mapping) for mapping in categories], codes, scores))
+
+    return participants, submissions_frame(*merge_submission_columns(partials))
+
+
+# Версия формата кэша: увеличить при изменении состава или типов сохраняемых массивов
+# (2 - баллы float64 вместо float32)
+LOG_CACHE_VERSION = 2
+
+
+def file_sha256(path):
+    """SHA-256 содержимого файла (читается блоками)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def log_cache_path(xml_path):
+    """Путь к файлу кэша рядом с XML логом"""
+    return Path(str(xml_path) + '.cache.npz')
+
+
+def participants_to_arrays(participants):
+    """Словарь участников в виде строковых массивов NumPy (для .npz без pickle)"""
+    return {
+        'user_ids': np.array(list(participants.keys()), dtype=str),
+        'names': np.array([data['name'] for data in participants.values()], dtype=str),
+        'grades': np.array([data['grade'] for data in participants.values()], dtype=str),
+        'municipalities': np.array([data['municipality'] for data in participants.values()], dtype=str)
+    }
+
+
+def participants_from_arrays(arrays):
+    """Обратное преобразование массивов из .npz в словарь участников"""
+    return {
+        uid: {'name': name, 'grade': grade, 'municipality': municipality}
+        for uid, name, grade, municipality in zip(
+            arrays['user_ids'].tolist(), arrays['names'].tolist(),
+            arrays['grades'].tolist(), arrays['municipalities'].tolist()
+        )
+    }
+
+
+def save_log_cache(xml_path, stat, participants, submissions):
+    """Сохранение разобранного лога в бинарный кэш (.npz из массивов NumPy)"""
+    arrays = {
+        'version': np.array(LOG_CACHE_VERSION),
+        'path': np.array(str(Path(xml_path).resolve())),
+        'size': np.array(stat.st_size, dtype=np.int64),
+        'mtime': np.array(stat.st_mtime_ns, dtype=np.int64),
+        'sha256': np.array(file_sha256(xml_path)),
+        'columns': np.array(list(submissions.columns), dtype=str),
+        **participants_to_arrays(participants)
+    }
+
+    # Категориальные столбцы храним как коды + словарь, баллы - как есть
+    for column in submissions.columns:
+        values = submissions[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            arrays[column + '.codes'] = values.cat.codes.to_numpy(dtype=np.intc)
+            arrays[column + '.categories'] = np.array(list(values.cat.categories), dtype=str)
+        else:
+            arrays[column] = values.to_numpy()
+
+    write_log_cache(log_cache_path(xml_path), arrays)
+
+
+def write_log_cache(cache_path, arrays):
+    """Запись массивов кэша: во временный файл с атомарной подменой, чтобы не оставить битый кэш.
+    Имя временного файла уникально - параллельные запуски не пишут в один и тот же файл"""
+    fd, tmp_path = tempfile.mkstemp(prefix=cache_path.stem + '.', suffix='.npz.tmp', dir=cache_path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def load_log_cache(xml_path, stat):
+    """Загрузка разобранного лога из кэша; None, если кэша нет или он устарел"""
+    cache_path = log_cache_path(xml_path)
+    if not cache_path.exists():
+        return None
+
+    with np.load(cache_path, allow_pickle=False) as cache:
+        if int(cache['version']) != LOG_CACHE_VERSION:
+            return None
+        if str(cache['path']) != str(Path(xml_path).resolve()) or int(cache['size']) != stat.st_size:
+            return None
+        # mtime сменился при том же размере - сверяем содержимое по хэшу
+        touched = int(cache['mtime']) != stat.st_mtime_ns
+        if touched and str(cache['sha256']) != file_sha256(xml_path):
+            return None
+
+        participants = participants_from_arrays(cache)
+
+        columns = {}
+        for column in cache['columns'].tolist():
+            if column + '.codes' in cache.files:
+                columns[column] = pd.Categorical.from_codes(
+                    cache[column + '.codes'], categories=category_index(cache[column + '.categories'].tolist())
+                )
+            else:
+                columns[column] = cache[column]
+
+        # Содержимое то же: запоминаем новый mtime, чтобы следующие запуски не хэшировали лог заново
+        arrays = {name: cache[name] for name in cache.files} if touched else None
+
+    if arrays is not None:
+        arrays['mtime'] = np.array(stat.st_mtime_ns, dtype=np.int64)
+        try:
+            write_log_cache(cache_path, arrays)
+        except OSError:
+            pass
+
+    return participants, pd.DataFrame(columns)
+
+
+def load_xml_log(xml_path, use_cache=True, backend=None, workers=1):
+    """Разобранный лог из кэша, а при его отсутствии - парсинг XML с сохранением кэша"""
+    if not use_cache:
+        return parse_xml_log(xml_path, backend, workers)
+
+    stat = os.stat(xml_path)
+    try:
+        cached = load_log_cache(xml_path, stat)
+    except Exception:
+        # Битый или недописанный кэш (BadZipFile, EOFError, ошибки разбора массивов) - просто промах
+        cached = None
+    if cached is not None:
+        return cached
+
+    participants, submissions = parse_xml_log(xml_path, backend, workers)
+    try:
+        save_log_cache(xml_path, stat, participants, submissions)
+    except OSError:
+        # Кэш - только ускорение: нет прав на запись - работаем без него
+        pass
+
+    return participants, submissions
+
+
+# Файлы логов при выборе папкой: XML и его сжатые варианты
+LOG_SUFFIXES = ('.xml', '.xml.gz', '.xml.bz2', '.xml.xz', '.xml.zst')
+
+
+def find_logs(source):
+    """Пути логов по источнику: файл, папка с логами или шаблон glob (tour*.xml); по алфавиту"""
+    path = Path(source)
+    if path.is_file():
+        return [path]
+    if path.is_dir():
+        return sorted(child for child in path.iterdir()
+                      if child.is_file() and child.name.lower().endswith(LOG_SUFFIXES))
+    # Под шаблон могут попасть кэши разобранных логов (.npz) - они не логи
+    return sorted(Path(match) for match in glob.glob(str(source))
+                  if os.path.isfile(match) and not match.endswith(('.npz', '.npz.tmp')))
+
+
+def contest_id(xml_path):
+    """Идентификатор олимпиады - имя файла лога без расширений (tour1.xml.gz -> tour1)"""
+    name = Path(xml_path).name
+    for suffix in sorted(LOG_SUFFIXES, key=len, reverse=True):
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return Path(name).stem
+
+
+def merge_logs(contests, logs):
+    """Объединение разобранных логов в один набор данных.
+
+    Реестр участников общий: участник, встречающийся в нескольких логах, записан один раз
+    (в порядке первого появления, с данными из последнего лога). К отправкам добавляется столбец
+    contest, а задачи получают префикс олимпиады - одноимённые задачи разных туров не смешиваются.
+    """
+    participants = {}
+    frames = []
+    for contest, (part_participants, part_submissions) in zip(contests, logs):
+        participants.update(part_participants)
+        frames.append(part_submissions.assign(
+            problem=part_submissions['problem'].cat.rename_categories(category_index(
+                f'{contest}: {title}' for title in part_submissions['problem'].cat.categories
+            ))
+        ))
+
+    # Словари категорий объединяются в порядке появления - как при разборе одного большого лога
+    submissions = pd.DataFrame({
+        column: union_categoricals([frame[column] for frame in frames])
+        if isinstance(frames[0][column].dtype, pd.CategoricalDtype)
+        else np.concatenate([frame[column].to_numpy() for frame in frames])
+        for column in frames[0].columns
+    })
+    submissions.insert(0, 'contest', pd.Categorical.from_codes(
+        np.repeat(np.arange(len(frames), dtype=np.intc), [len(frame) for frame in frames]), categories=contests
+    ))
+
+    return participants, submissions
+
+
+def load_xml_logs(source, use_cache=True, backend=None, workers=1):
+    """Разобранные логи по источнику (файл, папка или шаблон): один лог - как load_xml_log,
+    несколько - разбираются в workers процессах (по логу на процесс) и объединяются через merge_logs"""
+    paths = find_logs(source)
+    if not paths:
+        raise FileNotFoundError(f"Логи не найдены: {source}")
+    if len(paths) == 1:
+        return load_xml_log(paths[0], use_cache, backend, workers)
+
+    contests = [contest_id(path) for path in paths]
+    if len(set(contests)) != len(contests):
+        # Одноимённые логи из разных папок различаем по полному пути
+        contests = [str(path) for path in paths]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+            logs = list(executor.map(load_xml_log, paths, [use_cache] * len(paths), [backend] * len(paths)))
+    else:
+        logs = [load_xml_log(path, use_cache, backend) for path in paths]
+
+    return merge_logs(contests, logs)
+
+
+def get_best_scores(participants, submissions):
+    """Получаем лучшие баллы участников по всем задачам"""
+    # Категории упорядочиваем по значению: группы и слагаемые сумм идут в том же порядке, что и
+    # у строковых ключей, поэтому суммы дробных баллов совпадают до последнего знака
+    submissions = submissions[['user_id', 'problem', 'score']].assign(**{
+        column: submissions[column].cat.set_categories(sorted(submissions[column].cat.categories))
+        for column in ('user_id', 'problem')
+    })
+
+    # Группируем по участнику и задаче, берём максимальный балл
+    df_best = submissions.groupby(['user_id', 'problem'], as_index=False, observed=True)['score'].max()
+
+    # Суммируем баллы по участникам
+    df_total = df_best.groupby('user_id', as_index=False, observed=True)['score'].sum()
+    df_total = df_total.rename(columns={'score': 'total_score'})
+
+    # Добавляем информацию об участниках
+    df_total['grade'] = df_total['user_id'].map(lambda x: participants[x]['grade'])
+    df_total['municipality'] = df_total['user_id'].map(lambda x: participants[x]['municipality'])
+
+    return df_total
@@ -0,0 +1,1038 @@
+import os
+import sys
+import re
+import csv
+import glob
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import time
+import zlib
+import hashlib
+from collections import Counter, OrderedDict, namedtuple
+from functools import lru_cache
+
+from .xml_log import xml_records, split_events, events_chunk_records, outside_events_records
+
+# Этапы отсева пар перед точным расчётом расстояния (в порядке применения)
+PREFILTER_STAGES = {
+    'fine_by_length': 'в норме по длине текущего решения',
+    'no_previous': 'нет кода предыдущего решения',
+    'fine_identical': 'совпадают с предыдущим решением',
+    'suspicious_by_length_diff': 'подозрительны по разнице длин',
+    'suspicious_by_qgram': 'подозрительны по q-граммам',
+    'fine_by_levenshtein': 'в норме по расстоянию Левенштейна',
+    'suspicious_by_levenshtein': 'подозрительны по расстоянию Левенштейна',
+}
+QGRAM_SIZE = 3
+
+
+def qgram_lower_bound(s1, s2, q=QGRAM_SIZE):
+    """Нижняя оценка расстояния Левенштейна по количествам символов и q-грамм
+
+    Замена меняет количества двух символов на 1, вставка и удаление - одного, поэтому
+    расстояние не меньше наибольшего из избытков символов в каждой строке. Одна правка
+    меняет не больше 2q q-грамм, отсюда вторая оценка: разность мультимножеств q-грамм / 2q.
+    """
+    counts = Counter(s1)
+    counts.subtract(s2)
+    extra = sum(v for v in counts.values() if v > 0)
+    missing = -sum(v for v in counts.values() if v < 0)
+    bound = max(extra, missing)
+
+    if q > 1:
+        qgrams = Counter(s1[i:i + q] for i in range(len(s1) - q + 1))
+        qgrams.subtract(s2[i:i + q] for i in range(len(s2) - q + 1))
+        difference = sum(abs(v) for v in qgrams.values())
+        bound = max(bound, -(-difference // (2 * q)))
+
+    return bound
+
+
+def levenshtein_distance(s1, s2, max_distance=None):
+    """Расстояние Левенштейна (битово-параллельный алгоритм Майерса/Хюрё)
+
+    Строки матрицы хранятся битами целого числа, поэтому символ второй строки обрабатывается
+    за несколько операций над длинными целыми вместо цикла по всей строке.
+    Если задан max_distance, при заведомом превышении порога сразу возвращается max_distance + 1;
+    расстояние не больше порога всегда точное.
+    """
+    # Общие начало и конец на расстояние не влияют
+    prefix = 0
+    limit = min(len(s1), len(s2))
+    while prefix < limit and s1[prefix] == s2[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and s1[-1 - suffix] == s2[-1 - suffix]:
+        suffix += 1
+    s1 = s1[prefix:len(s1) - suffix]
+    s2 = s2[prefix:len(s2) - suffix]
+
+    # Битовый вектор строится по более короткой строке
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+
+    if max_distance is not None and len(s1) - len(s2) > max_distance:
+        return max_distance + 1
+
+    if len(s2) == 0:
+        return len(s1)
+
+    # Маски позиций каждого символа в короткой строке
+    peq = {}
+    for i, c in enumerate(s2):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    m = len(s2)
+    n = len(s1)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv = mask  # вертикальные приращения +1
+    mv = 0     # вертикальные приращения -1
+    distance = m
+
+    for j, c in enumerate(s1):
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+
+        if ph & high:
+            distance += 1
+        elif mh & high:
+            distance -= 1
+
+        # Последняя строка меняется не больше чем на 1 за символ - порог уже не достижим
+        if max_distance is not None and distance - (n - j - 1) > max_distance:
+            return max_distance + 1
+
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+
+    return distance
+
+# Отправка хранится компактным кортежем вместо словаря
+Submission = namedtuple('Submission', ['id', 'time', 'score', 'verdict', 'language'])
+
+
+def intern_text(value):
+    """Повторяющиеся строки (вердикты, языки, задачи) хранятся в одном экземпляре"""
+    return sys.intern(value) if value is not None else None
+
+
+def submission_entries(records):
+    """Отправки из записей submit бэкенда разбора XML: (участник, задача, Submission)"""
+    for _depth, _parent, _tag, attrib in records:
+        try:
+            yield intern_text(attrib.get('userId')), intern_text(attrib.get('problemTitle')), Submission(
+                attrib.get('id'),
+                int(attrib.get('contestTime', 0)),
+                float(attrib.get('score', 0)),
+                intern_text(attrib.get('verdict', '')),
+                intern_text(attrib.get('languageId', ''))
+            )
+        except (ValueError, TypeError):
+            continue
+
+
+def parse_submits_chunk(xml_path, declaration, start, end, backend=None):
+    """Отправки куска раздела events (выполняется в процессе-обработчике)"""
+    return list(submission_entries(events_chunk_records(xml_path, declaration, start, end, ('submit',), backend)))
+
+
+def parse_submissions_from_xml(xml_path, backend=None, workers=1):
+    """Парсинг всех submit событий из XML (backend - бэкенд разбора XML, по умолчанию самый быстрый;
+    workers > 1 - большой лог разбирается кусками раздела events в нескольких процессах)"""
+    print(f"Парсинг XML: {xml_path}")
+    
+    submissions_by_user = {}
+    
+    try:
+        layout = split_events(xml_path, workers) if workers > 1 else None
+        if layout is None:
+            # Бэкенд отдаёт только атрибуты submit и сам освобождает обработанные элементы
+            entries = submission_entries(xml_records(xml_path, ('submit',), backend))
+        else:
+            declaration, outside, chunks = layout
+            with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                futures = [executor.submit(parse_submits_chunk, xml_path, declaration, start, end, backend)
+                           for start, end in chunks]
+                # Отправки вне первого раздела events (обычно их нет) разбираем здесь
+                outside_entries = list(submission_entries(
+                    outside_events_records(xml_path, outside, ('submit',), backend)
+                ))
+                # Куски склеиваются в порядке файла; строки из других процессов заново интернируются
+                entries = [(intern_text(user_id), intern_text(problem_id), submission)
+                           for future in futures for user_id, problem_id, submission in future.result()]
+            entries += outside_entries
+        
+        for user_id, problem_id, submission in entries:
+            if user_id not in submissions_by_user:
+                submissions_by_user[user_id] = {}
+            
+            if problem_id not in submissions_by_user[user_id]:
+                submissions_by_user[user_id][problem_id] = []
+            
+            submissions_by_user[user_id][problem_id].append(submission)
+    
+    except Exception as e:
+        print(f"Ошибка парсинга XML: {e}")
+    
+    print(f"Найдено пользователей: {len(submissions_by_user)}")
+    return submissions_by_user
+
+# Расширения файлов с решениями и файл индекса в каталоге с кодом
+CODE_EXTENSIONS = ('.py', '.cpp', '.java', '.c', '.pas')
+# Индекс лежит рядом с каталогом кода: code -> code.submissions_index.json
+CODE_INDEX_FILE = '.submissions_index.json'
+CODE_INDEX_VERSION = 2
+
+
+def scan_code_dir(code_dir, saved_dirs):
+    """Обход каталога с кодом; каталоги с прежним mtime берутся из сохранённого индекса без чтения"""
+    dirs = {}
+    pending = ['']
+    while pending:
+        rel_dir = pending.pop()
+        try:
+            mtime = os.stat(os.path.join(code_dir, rel_dir)).st_mtime_ns
+        except OSError:
+            continue
+
+        entry = saved_dirs.get(rel_dir)
+        if entry is None or entry['mtime'] != mtime:
+            # Каталог изменился (добавлены/удалены файлы) - перечитываем только его
+            files, subdirs = [], []
+            with os.scandir(os.path.join(code_dir, rel_dir)) as items:
+                for item in items:
+                    if item.is_dir() and not item.is_symlink():
+                        subdirs.append(item.name)
+                    elif item.name.lower().endswith(CODE_EXTENSIONS):
+                        files.append(item.name)
+            entry = {'mtime': mtime, 'files': sorted(files), 'dirs': sorted(subdirs)}
+
+        dirs[rel_dir] = entry
+        pending.extend(os.path.join(rel_dir, name) for name in entry['dirs'])
+
+    return dirs
+
+
+def build_submission_index(code_dir, dirs):
+    """Индекс submission_id -> путь к файлу по точному совпадению id с именем файла
+
+    Id - имя файла без расширения (12345.cpp) или его последняя часть после "_" (user5_12345.cpp).
+    Id, которому соответствует несколько файлов (12345.cpp и 12345.py, 12345.cpp и user5_12345.cpp,
+    одноимённые файлы в разных каталогах), в индекс не попадает: угадывать файл нельзя - это даёт ложные пары.
+    """
+    index = {}
+    ambiguous = set()
+    for rel_dir in sorted(dirs):
+        for name in dirs[rel_dir]['files']:
+            stem = os.path.splitext(name)[0]
+            for submission_id in {stem, stem.rsplit('_', 1)[-1]}:
+                if submission_id in index:
+                    ambiguous.add(submission_id)
+                elif submission_id:
+                    index[submission_id] = os.path.join(code_dir, rel_dir, name)
+
+    for submission_id in ambiguous:
+        del index[submission_id]
+    if ambiguous:
+        print(f"Пропущено id с несколькими файлами кода: {len(ambiguous)}")
+    return index
+
+
+def code_index_path(code_dir):
+    """Путь к индексу рядом с каталогом кода (не внутри: запись индекса меняла бы mtime корня)"""
+    return os.path.abspath(code_dir).rstrip(os.sep) + CODE_INDEX_FILE
+
+
+def load_code_index(code_dir):
+    """Индекс файлов с кодом: сохраняется рядом с каталогом кода и обновляется только по изменившимся каталогам"""
+    index_path = code_index_path(code_dir)
+    saved_dirs = {}
+    try:
+        with open(index_path, encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('version') == CODE_INDEX_VERSION and saved.get('root') == os.path.abspath(code_dir):
+            saved_dirs = saved['dirs']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    dirs = scan_code_dir(code_dir, saved_dirs)
+
+    if dirs != saved_dirs:
+        try:
+            tmp_path = index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CODE_INDEX_VERSION, 'root': os.path.abspath(code_dir), 'dirs': dirs},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, index_path)
+        except OSError:
+            # Нет прав на запись - индекс просто не сохраняется между запусками
+            pass
+
+    return build_submission_index(code_dir, dirs)
+
+
+def code_index_signature(code_index):
+    """Хэш индекса файлов с кодом: добавленные, удалённые или переименованные файлы меняют его"""
+    return hashlib.sha256(json.dumps(sorted(code_index.items()), ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def find_code_file(submission_id, code_index):
+    """Поиск файла с кодом по ID отправки"""
+    return code_index.get(submission_id)
+
+
+def read_file_content(filepath):
+    """Чтение всего файла как текста"""
+    if not filepath or not os.path.exists(filepath):
+        return ""
+    
+    try:
+        with open(filepath, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return ""
+    
+    # Пробуем разные кодировки; переводы строк приводятся к \n, как при чтении в текстовом режиме
+    for encoding in ['utf-8', 'cp1251', 'latin-1']:
+        try:
+            text = data.decode(encoding, errors='ignore')
+            return text.replace('\r\n', '\n').replace('\r', '\n')
+        except (UnicodeDecodeError, LookupError):
+            continue
+    
+    return ""
+
+
+# Кэш текстов решений по хешу содержимого и кэш посчитанных расстояний (в каждом процессе свои)
+SOURCE_CACHE_SIZE = 4096
+DISTANCE_CACHE_SIZE = 65536
+source_hashes = {}
+source_texts = OrderedDict()
+source_tokens = OrderedDict()
+distance_cache = OrderedDict()
+
+
+def cache_get(cache, key):
+    """Значение из LRU-кэша (None, если его нет)"""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def cache_put(cache, key, value, maxsize):
+    """Запись в LRU-кэш с вытеснением самых старых значений"""
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
+def load_source(filepath):
+    """Хеш и текст решения; файл читается и декодируется один раз, одинаковые тексты хранятся один раз"""
+    digest = source_hashes.get(filepath)
+    text = cache_get(source_texts, digest) if digest else None
+    if text is None:
+        text = read_file_content(filepath)
+        digest = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+        source_hashes[filepath] = digest
+        text = cache_get(source_texts, digest) or text
+        cache_put(source_texts, digest, text, SOURCE_CACHE_SIZE)
+    return digest, text
+
+
+def cached_distance(hash1, s1, hash2, s2, max_distance=None):
+    """Расстояние Левенштейна с запоминанием по паре хешей; одинаковые тексты - сразу 0
+
+    В кэше хранится либо точное расстояние, либо результат с порогом (расстояние больше порога).
+    """
+    if hash1 == hash2:
+        return 0
+    
+    key = (hash1, hash2) if hash1 < hash2 else (hash2, hash1)
+    cached = cache_get(distance_cache, key)
+    if cached is not None:
+        distance, exact = cached
+        if exact:
+            return distance if max_distance is None or distance <= max_distance else max_distance + 1
+        if max_distance is not None and distance > max_distance:
+            return max_distance + 1
+    
+    distance = levenshtein_distance(s1, s2, max_distance)
+    exact = max_distance is None or distance <= max_distance
+    cache_put(distance_cache, key, (distance, exact), DISTANCE_CACHE_SIZE)
+    return distance
+
+
+# Лексический режим: решения сравниваются как последовательности токенов, в которых
+# идентификаторы, числа и строки заменены общими метками, а пробелы и комментарии отброшены
+C_KEYWORDS = frozenset("""
+    auto bool break case catch char class const continue default delete do double else enum extern
+    false final float for foreach func go goto if implements import include int interface long map
+    namespace new nullptr package private protected public range return short signed sizeof static
+    struct switch template this throw true try typedef typename unsigned using var vector virtual void
+    volatile while string let mut fn loop match impl pub fun val when object
+""".split())
+PYTHON_KEYWORDS = frozenset("""
+    and as assert break class continue def del elif else except False finally for from global if
+    import in is lambda None nonlocal not or pass raise return True try while with yield
+    print input int str float list dict set tuple range len map
+""".split())
+PASCAL_KEYWORDS = frozenset("""
+    and array begin case const div do downto else end file for function goto if in integer int64
+    longint real boolean char string label mod nil not of or procedure program readln read record
+    repeat set then to type until uses var while with writeln write xor shl shr
+""".split())
+
+C_LEXER = re.compile(r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/|\#[^\n]*)
+    |(?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+    |(?P<number>\d[\w.]*)
+    |(?P<word>[A-Za-z_]\w*)
+    |(?P<op>::|->|\+\+|--|<<=?|>>=?|&&|\|\||[-+*/%&|^<>=!]=|\S)
+""", re.S | re.X)
+PYTHON_LEXER = re.compile(r"""
+    (?P<comment>\#[^\n]*)
+    |(?P<string>[rRbBfFuU]{0,2}(?:'''.*?'''|\"\"\".*?\"\"\"|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'))
+    |(?P<number>\d[\w.]*)
+    |(?P<word>[A-Za-z_]\w*)
+    |(?P<op>\*\*=?|//=?|->|<<=?|>>=?|[-+*/%&|^<>=!:]=|\S)
+""", re.S | re.X)
+PASCAL_LEXER = re.compile(r"""
+    (?P<comment>\{.*?\}|\(\*.*?\*\)|//[^\n]*)
+    |(?P<string>(?:'(?:[^'\n]|'')*'|\#\d+)+)
+    |(?P<number>\$?\d[\w.]*)
+    |(?P<word>[A-Za-z_]\w*)
+    |(?P<op>:=|<>|<=|>=|\.\.|\S)
+""", re.S | re.X)
+
+# Лексер по languageId: (подстроки languageId, регулярное выражение, ключевые слова, без учёта регистра);
+# остальные языки разбираются C-подобным лексером
+LEXER_RULES = (
+    (('python', 'pypy'), PYTHON_LEXER, PYTHON_KEYWORDS, False),
+    (('pascal', 'delphi', 'fpc', 'dcc'), PASCAL_LEXER, PASCAL_KEYWORDS, True),
+)
+DEFAULT_LEXER = (C_LEXER, C_KEYWORDS, False)
+TOKEN_SPEED_LIMIT = 1  # токенов в секунду для лексического режима
+
+# Каждый токен кодируется одним символом, чтобы к последовательностям применялись те же функции, что и к тексту
+token_codes = {}
+
+
+@lru_cache(maxsize=None)
+def language_lexer(language_id):
+    """Лексер для языка решения"""
+    language_id = str(language_id).lower()
+    for patterns, lexer, keywords, ignore_case in LEXER_RULES:
+        if any(pattern in language_id for pattern in patterns):
+            return lexer, keywords, ignore_case
+    return DEFAULT_LEXER
+
+
+def tokenize_source(text, language_id):
+    """Текст решения в строку кодов токенов"""
+    lexer, keywords, ignore_case = language_lexer(language_id)
+    codes = []
+    for match in lexer.finditer(text):
+        kind = match.lastgroup
+        if kind == 'comment':
+            continue
+        if kind == 'word':
+            token = match.group().lower() if ignore_case else match.group()
+            if token not in keywords:
+                token = 'ID'
+        elif kind == 'op':
+            token = match.group()
+        else:
+            token = kind.upper()
+
+        code = token_codes.get(token)
+        if code is None:
+            code = token_codes[token] = chr(0x100 + len(token_codes))
+        codes.append(code)
+    return ''.join(codes)
+
+
+def load_tokens(filepath, language_id):
+    """Хеш и строка токенов решения (кэшируется так же, как текст)"""
+    digest, text = load_source(filepath)
+    key = (digest, language_lexer(language_id)[0].pattern)
+    cached = cache_get(source_tokens, key)
+    if cached is None:
+        tokens = tokenize_source(text, language_id)
+        cached = ('tokens:' + hashlib.blake2b(tokens.encode('utf-8'), digest_size=16).hexdigest(), tokens)
+        cache_put(source_tokens, key, cached, SOURCE_CACHE_SIZE)
+    return cached
+
+
+def load_sequence(filepath, language_id, tokens):
+    """Текст решения или, в лексическом режиме, строка его токенов"""
+    return load_tokens(filepath, language_id) if tokens else load_source(filepath)
+
+
+def analyze_user_problem(user_id, problem_id, solutions, code_index, min_score, speed_limit, stats=None, tokens=False):
+    """Анализ решений одной задачи одного пользователя (stats - счётчики этапов отсева пар)
+
+    При tokens=True расстояние считается в токенах, а speed_limit задаётся в токенах в секунду.
+    """
+    results = []
+    if stats is None:
+        stats = Counter()
+    
+    # Сортируем решения по времени
+    sorted_solutions = sorted(solutions, key=lambda x: x.time)
+    
+    for i in range(1, len(sorted_solutions)):
+        current = sorted_solutions[i]
+        previous = sorted_solutions[i-1]
+        
+        # Проверяем минимальный балл
+        if current.score < min_score or previous.score < min_score:
+            continue
+        
+        # Время между отправками в секундах
+        time_diff = (current.time - previous.time) / 1000.0
+        
+        # Находим файлы с кодом
+        current_file = find_code_file(current.id, code_index)
+        previous_file = find_code_file(previous.id, code_index)
+        
+        if not current_file:
+            continue
+        
+        # Проверяем критерий плагиата
+        allowed = speed_limit * time_diff
+        
+        # Расстояние до пустой строки - верхняя оценка: если оно в норме, пара точно не подозрительна
+        current_hash, current_text = load_sequence(current_file, current.language, tokens)
+        l2 = len(current_text)
+        if l2 <= allowed:
+            stats['fine_by_length'] += 1
+            continue
+        
+        previous_hash, previous_text = load_sequence(previous_file, previous.language, tokens) if previous_file else (None, "")
+        if not previous_text:
+            stats['no_previous'] += 1
+            l = l2
+        elif previous_hash == current_hash:
+            # Повторная отправка того же кода
+            stats['fine_identical'] += 1
+            continue
+        else:
+            # Нижние оценки: разница длин, затем количества символов и q-грамм
+            lower = abs(len(previous_text) - l2)
+            if lower > allowed:
+                stats['suspicious_by_length_diff'] += 1
+            else:
+                lower = max(lower, qgram_lower_bound(previous_text, current_text))
+                if lower > allowed:
+                    stats['suspicious_by_qgram'] += 1
+            
+            if lower > allowed:
+                # Пара точно подозрительна, точное расстояние нужно только для отчёта
+                l = min(cached_distance(previous_hash, previous_text, current_hash, current_text), l2) if lower < l2 else l2
+            else:
+                # Неясные пары - точный расчёт с ранним выходом по порогу
+                l = cached_distance(previous_hash, previous_text, current_hash, current_text, max(int(allowed), 0))
+                if l > allowed:
+                    stats['suspicious_by_levenshtein'] += 1
+                    l = min(cached_distance(previous_hash, previous_text, current_hash, current_text), l2) if l < l2 else l2
+                else:
+                    stats['fine_by_levenshtein'] += 1
+        
+        if l > allowed:
+            results.append({
+                'user_id': user_id,
+                'problem_id': problem_id,
+                'prev_sub_id': previous.id,
+                'curr_sub_id': current.id,
+                'prev_score': previous.score,
+                'curr_score': current.score,
+                'prev_time': previous.time,
+                'curr_time': current.time,
+                'time_diff_sec': time_diff,
+                'levenshtein': l,
+                'allowed_speed': allowed,
+                'excess': l - allowed,
+                'prev_file': previous_file or "",
+                'curr_file': current_file,
+                'prev_verdict': previous.verdict,
+                'curr_verdict': current.verdict
+            })
+    
+    return results
+
+def make_batches(tasks, code_index, batch_size):
+    """Разбиение задач на пакеты для процессов
+
+    В пакет попадают только id, время, баллы и пути к файлам нужных отправок -
+    общий индекс и содержимое файлов в процессы не передаются.
+    """
+    for start in range(0, len(tasks), batch_size):
+        batch = tasks[start:start + batch_size]
+        batch_index = {}
+        for user_id, problem_id, solutions in batch:
+            for solution in solutions:
+                path = code_index.get(solution.id)
+                if path:
+                    batch_index[solution.id] = path
+        yield batch, batch_index
+
+
+def analyze_batch(batch, batch_index, min_score, speed_limit, tokens=False):
+    """Анализ пакета задач в отдельном процессе; возвращает число задач, найденные пары и счётчики отсева"""
+    results = []
+    stats = Counter()
+    for user_id, problem_id, solutions in batch:
+        results.extend(analyze_user_problem(user_id, problem_id, solutions, batch_index, min_score, speed_limit, stats, tokens))
+    return len(batch), results, stats
+
+
+# Поиск похожих решений разных участников одной задачи
+SHINGLE_SIZE = 3            # токенов в шингле
+TOKEN_SHINGLE_SIZE = 6      # токенов в шингле в лексическом режиме (токены обезличены, нужен шингл длиннее)
+MINHASH_PERMUTATIONS = 128  # длина MinHash-подписи
+# 64 полосы по 2 значения: кандидатами становятся пары с похожестью шинглов от ~0.15 ((1/64) ** (1/2)).
+# Правки, разбросанные по тексту, задевают большую часть шинглов, и у пар с похожестью текста 0.8
+# похожесть шинглов бывает 0.2-0.4: при 32 полосах по 4 значения терялась треть таких пар и больше.
+# На синтетических наборах (tests/test_cross_users.py) находится 80-95% пар, найденных полным перебором,
+# при этом кандидатов - единицы процентов от всех пар
+LSH_BANDS = 64
+CROSS_SIMILARITY = 0.8      # минимальная похожесть 1 - расстояние / длина большего решения
+MINHASH_PRIME = (1 << 31) - 1
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+
+@lru_cache(maxsize=None)
+def minhash_coefficients():
+    """Коэффициенты хеш-функций (a * x + b) mod p; фиксированы, чтобы подписи совпадали во всех процессах"""
+    import numpy as np
+
+    rng = np.random.default_rng(31)
+    a = rng.integers(1, MINHASH_PRIME, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+    b = rng.integers(0, MINHASH_PRIME, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+    return a, b
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE, tokens=False):
+    """Хеши различных шинглов - последовательностей из size подряд идущих токенов
+
+    При tokens=True text - уже строка кодов токенов (лексический режим).
+    """
+    import numpy as np
+
+    tokens = list(text) if tokens else TOKEN_PATTERN.findall(text)
+    if len(tokens) <= size:
+        shingles = [' '.join(tokens)] if tokens else []
+    else:
+        shingles = (' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1))
+    hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8', 'surrogatepass')) for shingle in shingles), dtype=np.uint64)
+    return np.unique(hashes)
+
+
+def minhash_signature(hashes):
+    """MinHash-подпись множества шинглов: минимум каждой хеш-функции по всем шинглам"""
+    import numpy as np
+
+    if len(hashes) == 0:
+        return np.full(MINHASH_PERMUTATIONS, MINHASH_PRIME, dtype=np.uint64)
+    a, b = minhash_coefficients()
+    values = hashes % MINHASH_PRIME
+    return ((np.outer(a, values) + b[:, None]) % MINHASH_PRIME).min(axis=1)
+
+
+def lsh_candidates(signatures, bands=LSH_BANDS):
+    """Пары индексов решений, у которых совпала хотя бы одна полоса подписи"""
+    rows = signatures.shape[1] // bands
+    candidates = set()
+    for band in range(bands):
+        buckets = {}
+        for i, signature in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+            buckets.setdefault(signature.tobytes(), []).append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    candidates.add((members[x], members[y]))
+    return candidates
+
+
+def analyze_problem_cross_users(problem_id, entries, min_similarity=CROSS_SIMILARITY, tokens=False):
+    """Похожие решения разных участников одной задачи
+
+    entries - список (user_id, submission_id, путь к файлу, languageId). Кандидаты выбираются по MinHash/LSH,
+    точное расстояние считается только для них. Возвращает найденные пары и число кандидатов.
+    """
+    # numpy нужен только этому режиму, поэтому не замедляет запуск обычной проверки
+    import numpy as np
+
+    sources = [load_sequence(path, language, tokens) for user_id, submission_id, path, language in entries]
+    size = TOKEN_SHINGLE_SIZE if tokens else SHINGLE_SIZE
+    signatures = np.array([minhash_signature(shingle_hashes(text, size, tokens)) for digest, text in sources])
+    candidates = lsh_candidates(signatures) if len(entries) > 1 else set()
+
+    results = []
+    for i, j in sorted(candidates):
+        (hash_i, text_i), (hash_j, text_j) = sources[i], sources[j]
+        longest = max(len(text_i), len(text_j))
+        if longest == 0:
+            continue
+
+        # Разница длин - нижняя оценка расстояния
+        max_distance = int((1 - min_similarity) * longest)
+        if abs(len(text_i) - len(text_j)) > max_distance:
+            continue
+
+        distance = cached_distance(hash_i, text_i, hash_j, text_j, max_distance)
+        if distance > max_distance:
+            continue
+
+        results.append({
+            'problem_id': problem_id,
+            'user_a': entries[i][0],
+            'sub_a': entries[i][1],
+            'user_b': entries[j][0],
+            'sub_b': entries[j][1],
+            'levenshtein': distance,
+            'similarity': round(1 - distance / longest, 4),
+            'minhash_similarity': round(float((signatures[i] == signatures[j]).mean()), 4),
+            'file_a': entries[i][2],
+            'file_b': entries[j][2]
+        })
+
+    return results, len(candidates)
+
+
+def cross_user_entries(submissions, code_index, min_score):
+    """Для каждой задачи - лучшее (при равенстве последнее) решение каждого участника с кодом"""
+    problems = {}
+    for user_id, user_problems in submissions.items():
+        for problem_id, solutions in user_problems.items():
+            passed = [solution for solution in solutions
+                      if solution.score >= min_score and code_index.get(solution.id)]
+            if passed:
+                best = max(passed, key=lambda x: (x.score, x.time))
+                problems.setdefault(problem_id, []).append((user_id, best.id, code_index[best.id], best.language))
+    return problems
+
+
+def run_cross_user_search(submissions, code_index, min_score, workers, tokens=False):
+    """Поиск похожих решений разных участников: задачи обрабатываются в нескольких процессах"""
+    problems = cross_user_entries(submissions, code_index, min_score)
+    results = []
+    candidate_count = 0
+    pair_count = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(analyze_problem_cross_users, problem_id, entries, CROSS_SIMILARITY, tokens)
+                   for problem_id, entries in problems.items()]
+        for entries in problems.values():
+            pair_count += len(entries) * (len(entries) - 1) // 2
+
+        for future in as_completed(futures):
+            try:
+                problem_results, problem_candidates = future.result()
+                results.extend(problem_results)
+                candidate_count += problem_candidates
+            except Exception as e:
+                print(f"Ошибка при поиске похожих решений: {e}")
+
+    print(f"Кандидатов после LSH: {candidate_count} из {pair_count} пар")
+    return results
+
+
+CROSS_FIELDNAMES = [
+    'problem_id', 'user_a', 'sub_a', 'user_b', 'sub_b', 'levenshtein',
+    'similarity', 'minhash_similarity', 'file_a', 'file_b'
+]
+
+
+RESULT_FIELDNAMES = [
+    'user_id', 'problem_id', 'prev_sub_id', 'curr_sub_id',
+    'prev_score', 'curr_score', 'prev_time', 'curr_time',
+    'time_diff_sec', 'levenshtein', 'allowed_speed',
+    'excess', 'prev_file', 'curr_file',
+    'prev_verdict', 'curr_verdict'
+]
+RESULT_NUMBERS = {
+    'prev_score': float, 'curr_score': float, 'prev_time': int, 'curr_time': int,
+    'time_diff_sec': float, 'levenshtein': int, 'allowed_speed': float, 'excess': float
+}
+
+
+def checkpoint_path(csv_path):
+    """Файл контрольной точки: параметры запуска и завершённые задачи (user_id, problem_id)"""
+    return csv_path + '.checkpoint'
+
+
+def find_unfinished_run(run_params):
+    """CSV прерванного запуска с теми же параметрами (у завершённых запусков контрольной точки нет)"""
+    for path in sorted(glob.glob('suspicious_solutions_*.csv.checkpoint'), reverse=True):
+        try:
+            with open(path, encoding='utf-8') as f:
+                if json.loads(f.readline()) == run_params:
+                    return path[:-len('.checkpoint')]
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def start_results_file(csv_path, run_params):
+    """Новый CSV с заголовком и контрольная точка с параметрами запуска"""
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        csv.DictWriter(f, fieldnames=RESULT_FIELDNAMES).writeheader()
+    with open(checkpoint_path(csv_path), 'w', encoding='utf-8') as f:
+        f.write(json.dumps(run_params, ensure_ascii=False) + '\n')
+
+
+def resume_results(csv_path):
+    """Завершённые задачи и их результаты из прерванного запуска
+
+    Строки задач, не попавших в контрольную точку (запуск оборвался между записью CSV
+    и контрольной точки), удаляются - эти задачи будут проанализированы заново.
+    """
+    done_tasks = set()
+    with open(checkpoint_path(csv_path), encoding='utf-8') as f:
+        f.readline()
+        for line in f:
+            try:
+                done_tasks.add(tuple(json.loads(line)))
+            except ValueError:
+                # Недописанная последняя строка
+                break
+
+    results = []
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if (row['user_id'], row['problem_id']) not in done_tasks:
+                continue
+            try:
+                for field, convert in RESULT_NUMBERS.items():
+                    row[field] = convert(row[field])
+            except (TypeError, ValueError):
+                continue
+            results.append(row)
+
+    tmp_path = csv_path + '.tmp'
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(results)
+    os.replace(tmp_path, csv_path)
+
+    return done_tasks, results
+
+
+def append_results(csv_path, results, task_keys):
+    """Дозапись результатов пакета в CSV, затем отметка его задач в контрольной точке"""
+    with open(csv_path, 'a', newline='', encoding='utf-8') as f:
+        csv.DictWriter(f, fieldnames=RESULT_FIELDNAMES).writerows(results)
+        f.flush()
+        os.fsync(f.fileno())
+    with open(checkpoint_path(csv_path), 'a', encoding='utf-8') as f:
+        f.writelines(json.dumps(key, ensure_ascii=False) + '\n' for key in task_keys)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def save_results_csv(results, output_path, fieldnames=None):
+    """Сохранение результатов в CSV файл"""
+    if not results:
+        print("Нет данных для сохранения")
+        return
+    
+    # Определяем заголовки
+    fieldnames = fieldnames or RESULT_FIELDNAMES
+    
+    try:
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(results)
+        
+        print(f"Сохранено {len(results)} записей в {output_path}")
+        
+    except Exception as e:
+        print(f"Ошибка при сохранении CSV: {e}")
+
+def main(argv=None):
+    """Основная функция (argv - аргументы командной строки без имени скрипта)"""
+    argv = sys.argv[1:] if argv is None else argv
+    
+    # Конфигурация
+    SPEED_LIMIT = 3  # символов в секунду
+    MIN_SCORE = 101  # минимальный балл
+    WORKERS = os.cpu_count() or 1  # количество процессов (третий аргумент командной строки)
+    
+    # Флаги: --cross-users - поиск похожих решений разных участников,
+    # --tokens - сравнение последовательностей токенов вместо текста,
+    # --no-resume - не продолжать прерванный запуск, а начать заново,
+    # --parser=ИМЯ - бэкенд разбора XML (expat, etree, lxml)
+    flags = {arg for arg in argv if arg.startswith('--')}
+    args = [arg for arg in argv if not arg.startswith('--')]
+    cross_users = '--cross-users' in flags
+    tokens = '--tokens' in flags
+    backend = next((flag.split('=', 1)[1] for flag in flags if flag.startswith('--parser=')), None)
+    speed_limit = TOKEN_SPEED_LIMIT if tokens else SPEED_LIMIT
+    
+    # Ввод параметров
+    if len(args) > 0:
+        xml_file = args[0]
+        code_dir = args[1] if len(args) > 1 else input("Путь к папке с кодом: ")
+    else:
+        xml_file = input("Путь к XML файлу: ").strip()
+        code_dir = input("Путь к папке с кодом: ").strip()
+    
+    workers = max(1, int(args[2])) if len(args) > 2 else WORKERS
+    
+    if not os.path.exists(xml_file):
+        print(f"Файл не найден: {xml_file}")
+        return
+    
+    if not os.path.exists(code_dir):
+        print(f"Папка не найдена: {code_dir}")
+        return
+    
+    # Чтение XML
+    start_time = time.time()
+    submissions = parse_submissions_from_xml(xml_file, backend, workers)
+    
+    if not submissions:
+        print("Нет данных для анализа")
+        return
+    
+    # Индекс файлов с кодом строится один раз (и дообновляется с прошлого запуска)
+    code_index = load_code_index(code_dir)
+    print(f"Файлов с кодом в индексе: {len(code_index)}")
+
+    # Подготовка задач для параллельного анализа
+    print("\nАнализ решений" + (" по токенам..." if tokens else "..."))
+    tasks = []
+    
+    for user_id, problems in submissions.items():
+        for problem_id, solutions in problems.items():
+            if len(solutions) >= 2:  # Нужно минимум 2 решения для сравнения
+                tasks.append((user_id, problem_id, solutions))
+    total_tasks = len(tasks)
+    
+    # Результаты пишутся в CSV по мере готовности, завершённые задачи - в контрольную точку;
+    # прерванный запуск с теми же параметрами продолжается с места остановки. Лог и каталог кода
+    # сверяются не только по путям: изменённый лог или набор файлов кода означает новый запуск
+    xml_stat = os.stat(xml_file)
+    run_params = {
+        'xml': os.path.abspath(xml_file),
+        'xml_size': xml_stat.st_size,
+        'xml_mtime': xml_stat.st_mtime_ns,
+        'code_dir': os.path.abspath(code_dir),
+        'code_index': code_index_signature(code_index),
+        'tokens': tokens,
+        'speed_limit': speed_limit,
+        'min_score': MIN_SCORE
+    }
+    csv_file = None if '--no-resume' in flags else find_unfinished_run(run_params)
+    if csv_file:
+        done_tasks, all_results = resume_results(csv_file)
+        tasks = [task for task in tasks if (task[0], task[1]) not in done_tasks]
+        print(f"Продолжение прерванного запуска {csv_file}: осталось {len(tasks)}/{total_tasks} задач")
+    else:
+        csv_file = f"suspicious_solutions_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+        all_results = []
+        start_results_file(csv_file, run_params)
+    
+    # Анализ в нескольких процессах: расстояние Левенштейна считается на Python
+    # и упирается в GIL, поэтому потоки не ускоряют работу. Задачи отправляются пакетами,
+    # примерно по 4 пакета на процесс, чтобы реже передавать данные между процессами
+    print(f"Процессов: {workers}")
+    batch_size = max(1, min(256, -(-len(tasks) // (workers * 4))))
+    done = 0
+    reported = 0
+    stats = Counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(analyze_batch, batch, batch_index, MIN_SCORE, speed_limit, tokens):
+                [(user_id, problem_id) for user_id, problem_id, solutions in batch]
+            for batch, batch_index in make_batches(tasks, code_index, batch_size)
+        }
+        
+        # Сбор результатов
+        for future in as_completed(futures):
+            try:
+                batch_count, batch_results, batch_stats = future.result()
+                append_results(csv_file, batch_results, futures[future])
+                all_results.extend(batch_results)
+                stats.update(batch_stats)
+                done += batch_count
+                
+                if done - reported >= 100 or done == len(tasks):
+                    reported = done
+                    print(f"Обработано {done}/{len(tasks)} задач, найдено {len(all_results)} подозрительных")
+                    
+            except Exception as e:
+                print(f"Ошибка при анализе пакета задач: {e}")
+    
+    # Вывод статистики
+    elapsed = time.time() - start_time
+    print(f"\n{'='*60}")
+    print("АНАЛИЗ ЗАВЕРШЕН")
+    print(f"{'='*60}")
+    print(f"Время выполнения: {elapsed:.2f} сек")
+    print(f"Обработано пользователей: {len(submissions)}")
+    print(f"Обработано задач: {total_tasks}")
+    print(f"Найдено подозрительных пар: {len(all_results)}")
+    
+    # Сколько пар решено на каждом этапе отсева
+    print("\nОтсев пар по этапам:")
+    for stage, label in PREFILTER_STAGES.items():
+        print(f"  {label}: {stats[stage]}")
+    
+    # Все задачи проанализированы - контрольная точка больше не нужна
+    if done == len(tasks):
+        os.remove(checkpoint_path(csv_file))
+    else:
+        print("Часть задач не проанализирована - повторный запуск продолжит с места остановки")
+    
+    if all_results:
+        print(f"Сохранено {len(all_results)} записей в {csv_file}")
+        
+        # Краткая статистика
+        print(f"\nСтатистика подозрительных решений:")
+        print(f"{'-'*60}")
+        
+        # Группировка по пользователям
+        user_counts = {}
+        for result in all_results:
+            user_id = result['user_id']
+            user_counts[user_id] = user_counts.get(user_id, 0) + 1
+        
+        # Топ-10 пользователей
+        sorted_users = sorted(user_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        print("Топ-10 пользователей с подозрительными решениями:")
+        for user_id, count in sorted_users:
+            print(f"  {user_id}: {count} подозрительных пар")
+        
+        # Наибольшие превышения
+        if all_results:
+            sorted_by_excess = sorted(all_results, key=lambda x: x['excess'], reverse=True)[:5]
+            print(f"\nТоп-5 наибольших превышений:")
+            for result in sorted_by_excess:
+                print(f"  User {result['user_id']}, Problem {result['problem_id']}: "
+                      f"время={result['time_diff_sec']:.1f}с, "
+                      f"превышение={result['excess']:.1f}")
+    else:
+        print("Подозрительных решений не найдено.")
+    
+    if cross_users:
+        print("\nПоиск похожих решений разных участников...")
+        cross_results = run_cross_user_search(submissions, code_index, MIN_SCORE, workers, tokens)
+        print(f"Найдено похожих пар: {len(cross_results)}")
+        if cross_results:
+            cross_results.sort(key=lambda x: x['similarity'], reverse=True)
+            save_results_csv(cross_results, f"cross_user_solutions_{time.strftime('%Y%m%d_%H%M%S')}.csv", CROSS_FIELDNAMES)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from .standings import refresh_live_state, live_best_scores, create_results_table
+
+
+class LiveStandings:
+    """Разобранный лог и итоговые таблицы в памяти; обновляются при изменении файла"""
+
+    def __init__(self, xml_path):
+        self.xml_path = xml_path
+        self.state = None
+        self.version = 0
+        self.file_stamp = None
+        self.tables = {}
+        self.changed = threading.Condition()
+        self.refresh()
+
+    def refresh(self):
+        """Дочитывание новых событий лога, если файл изменился; True - появилась новая версия"""
+        stat = os.stat(self.xml_path)
+        file_stamp = (stat.st_size, stat.st_mtime_ns)
+        if file_stamp == self.file_stamp:
+            return False
+
+        # Состояние дочитывается на месте, поэтому читатели ждут окончания обновления
+        with self.changed:
+            self.state = refresh_live_state(self.xml_path, self.state)
+            self.file_stamp = file_stamp
+            self.version += 1
+            # Таблицы по фильтрам считаются заново по запросу
+            self.tables = {}
+            self.changed.notify_all()
+        return True
+
+    def watch(self, interval):
+        """Фоновое слежение за логом"""
+        while True:
+            time.sleep(interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Ошибка обновления лога: {e}")
+
+    def standings(self, grade=None, municipality=None):
+        """Версия и итоговая таблица для фильтра (считается один раз на версию)"""
+        with self.changed:
+            version, participants = self.version, self.state['participants']
+            key = (grade, municipality)
+            if key in self.tables:
+                return version, self.tables[key]
+            submissions = live_best_scores(self.state)
+
+        df_results = create_results_table(
+            participants,
+            submissions,
+            target_grade=grade,
+            target_municipality=municipality,
+            with_user_id=True
+        )
+
+        with self.changed:
+            if self.version == version:
+                self.tables[key] = df_results
+        return version, df_results
+
+    def wait_for_version(self, version, timeout):
+        """Ожидание версии новее заданной; возвращает текущую версию"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version > version, timeout=timeout)
+            return self.version
+
+
+def table_rows(df_results):
+    """Строки таблицы по user_id (для вычисления изменений между версиями)"""
+    if df_results.empty:
+        return {}
+    return {row['user_id']: row for row in df_results.to_dict(orient='records')}
+
+
+def table_delta(previous_rows, current_rows):
+    """Изменения таблицы: новые и изменившиеся строки, выбывшие участники"""
+    changed = [row for uid, row in current_rows.items() if previous_rows.get(uid) != row]
+    removed = [uid for uid in previous_rows if uid not in current_rows]
+    return changed, removed
+
+
+class StandingsHandler(BaseHTTPRequestHandler):
+    """HTTP API: /standings (JSON), /standings.csv и /events (поток изменений Server-Sent Events)"""
+
+    live = None
+    keepalive = 15.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        grade = query.get('grade', [None])[0]
+        municipality = query.get('municipality', [None])[0]
+
+        if url.path == '/standings':
+            version, df_results = self.live.standings(grade, municipality)
+            self.send_json({
+                'version': version,
+                'columns': list(df_results.columns),
+                'rows': list(table_rows(df_results).values())
+            })
+        elif url.path == '/standings.csv':
+            version, df_results = self.live.standings(grade, municipality)
+            body = df_results.drop(columns='user_id', errors='ignore').to_csv(sep=';', index=False).encode('utf-8-sig')
+            self.send_body(body, 'text/csv; charset=utf-8')
+        elif url.path == '/events':
+            self.stream_events(grade, municipality)
+        else:
+            self.send_error(404)
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, data):
+        self.send_body(json.dumps(data, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8')
+
+    def send_event(self, name, data):
+        payload = json.dumps(data, ensure_ascii=False)
+        self.wfile.write(f"event: {name}\ndata: {payload}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+    def stream_events(self, grade, municipality):
+        """Сначала полная таблица, затем только изменившиеся строки при каждой новой версии"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        try:
+            version, df_results = self.live.standings(grade, municipality)
+            rows = table_rows(df_results)
+            self.send_event('snapshot', {
+                'version': version,
+                'columns': list(df_results.columns),
+                'rows': list(rows.values())
+            })
+
+            while True:
+                if self.live.wait_for_version(version, self.keepalive) == version:
+                    # Комментарий SSE, чтобы соединение не закрылось по простою
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+
+                version, df_results = self.live.standings(grade, municipality)
+                current_rows = table_rows(df_results)
+                changed, removed = table_delta(rows, current_rows)
+                rows = current_rows
+                if changed or removed:
+                    self.send_event('delta', {
+                        'version': version,
+                        'columns': list(df_results.columns),
+                        'changed': changed,
+                        'removed': removed
+                    })
+        except (BrokenPipeError, ConnectionResetError):
+            # Клиент отключился
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Сервер живой итоговой таблицы олимпиады')
+    parser.add_argument('--xml', default='log.xml', help='Путь к XML файлу с логами')
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес сервера')
+    parser.add_argument('--port', type=int, default=8000, help='Порт сервера')
+    parser.add_argument('--interval', type=float, default=2.0, help='Период проверки лога на изменения, сек')
+
+    args = parser.parse_args(argv)
+
+    StandingsHandler.live = LiveStandings(args.xml)
+    threading.Thread(target=StandingsHandler.live.watch, args=(args.interval,), daemon=True).start()
+
+    server = ThreadingHTTPServer((args.host, args.port), StandingsHandler)
+    server.daemon_threads = True
+    print(f"Итоговая таблица: http://{args.host}:{args.port}/standings")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
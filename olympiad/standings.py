@@ -0,0 +1,540 @@
+import os
+import re
+import hashlib
+import importlib.util
+import xml.etree.ElementTree as ET
+import pandas as pd
+import numpy as np
+import argparse
+from pathlib import Path
+
+from .xml_log import (parse_displayed_name, parse_score, available_xml_backends, log_compression,
+                      EVENTS_OPEN, EVENTS_CLOSE)
+from .log_table import (intern_code, load_xml_logs, participants_to_arrays, participants_from_arrays,
+                        write_log_cache)
+
+
+# Версия формата состояния инкрементального режима (2 - матрица лучших баллов float64 вместо float32)
+LIVE_STATE_VERSION = 2
+
+# Размер блока чтения лога и длина "якоря" - байтов перед смещением, по которым проверяем,
+# что уже обработанная часть файла не переписана
+LIVE_READ_BLOCK = 1 << 22
+LIVE_ANCHOR_SIZE = 256
+
+# Тег целиком: ">" внутри значений атрибутов в кавычках тег не закрывает
+COMPLETE_TAG = re.compile(rb'<(?:[^"\'>]|"[^"]*"|\'[^\']*\')*>')
+
+
+def live_state_path(xml_path):
+    """Путь к файлу состояния инкрементального режима рядом с XML логом"""
+    return Path(str(xml_path) + '.live.npz')
+
+
+def read_log_head(xml_path):
+    """Участники, XML-декларация, смещение начала раздела events (сразу после тега <events>) и хэш начала файла"""
+    # Дочитывание идёт по смещениям в файле, поэтому сжатый лог здесь не подходит
+    if log_compression(xml_path) is not None:
+        raise ValueError('Инкрементальный режим работает только с несжатым логом')
+
+    head = b''
+    with open(xml_path, 'rb') as f:
+        while True:
+            match = EVENTS_OPEN.search(head)
+            if match and head.find(b'>', match.start()) != -1:
+                break
+            block = f.read(LIVE_READ_BLOCK)
+            if not block:
+                raise ValueError('В логе не найден раздел events')
+            head += block
+
+    events_offset = head.find(b'>', match.start()) + 1
+    head = head[:events_offset]
+
+    # Декларация нужна, чтобы дочитывать хвост лога в той же кодировке
+    declaration = head[:head.find(b'?>') + 2] if head.startswith(b'<?xml') else b''
+
+    # Разбираем только начало файла; незакрытые корень и events парсеру не мешают
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    parser.feed(head)
+    participants = {}
+    stack = []
+    for event, elem in parser.read_events():
+        if event == 'start':
+            stack.append(elem)
+            continue
+        stack.pop()
+        if len(stack) == 2 and stack[-1].tag == 'users' and elem.tag == 'user':
+            participants[elem.get('id')] = parse_displayed_name(elem.get('displayedName'))
+
+    return participants, declaration, events_offset, hashlib.sha256(head).hexdigest()
+
+
+def new_live_state(xml_path):
+    """Пустое состояние: участники из начала лога, отправок ещё нет"""
+    participants, declaration, offset, head_sha256 = read_log_head(xml_path)
+    return {
+        'participants': participants,
+        'declaration': declaration,
+        'head_size': offset,
+        'head_sha256': head_sha256,
+        'offset': offset,
+        'anchor': b'',
+        'user_ids': {},
+        'problems': {},
+        # Лучшие баллы: строки - участники, столбцы - задачи, NaN - отправок не было
+        'best': np.full((0, 0), np.nan, dtype=np.float64)
+    }
+
+
+def apply_live_submits(state, user_ids, problems, scores):
+    """Обновление лучших баллов пачкой новых отправок прямо в матрице состояния"""
+    rows = np.fromiter((intern_code(state['user_ids'], uid) for uid in user_ids), dtype=np.intp, count=len(user_ids))
+    cols = np.fromiter((intern_code(state['problems'], title) for title in problems), dtype=np.intp, count=len(problems))
+
+    # Матрица растёт с запасом, чтобы не копировать её на каждой пачке
+    best = state['best']
+    n_users, n_problems = len(state['user_ids']), len(state['problems'])
+    if n_users > best.shape[0] or n_problems > best.shape[1]:
+        grown = np.full((max(n_users, 2 * best.shape[0]), max(n_problems, best.shape[1] + 8)), np.nan, dtype=np.float64)
+        grown[:best.shape[0], :best.shape[1]] = best
+        state['best'] = best = grown
+
+    np.fmax.at(best.reshape(-1), rows * best.shape[1] + cols, np.asarray(scores, dtype=np.float64))
+
+
+def read_new_submits(xml_path, state):
+    """Дочитывание лога с сохранённого смещения: разбираются только новые отправки"""
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    # Хвост разбираем как содержимое искусственного <events>, продолжая исходный раздел
+    parser.feed(state['declaration'] + b'<events>')
+    stack = [elem for event, elem in parser.read_events()]
+
+    offset = state['offset']
+    pending = b''
+    user_ids, problems, scores = [], [], []
+
+    with open(xml_path, 'rb') as f:
+        f.seek(offset)
+        while True:
+            block = f.read(LIVE_READ_BLOCK)
+            data = pending + block
+            if not data:
+                break
+
+            # Закрывающий </events> - конец раздела; дальше не читаем
+            end = data.find(EVENTS_CLOSE)
+
+            # Последний незаконченный элемент оставляем до следующего блока (или запуска). Режем перед
+            # последним "<": в значениях атрибутов и тексте он всегда экранирован, а ">" - нет;
+            # сам последний тег берём, только если он закрыт с учётом кавычек
+            limit = end if end != -1 else len(data)
+            cut = data.rfind(b'<', 0, limit)
+            if cut == -1:
+                cut = limit
+            else:
+                tag = COMPLETE_TAG.match(data, cut, limit)
+                if tag:
+                    cut = tag.end()
+            ready, pending = data[:cut], data[cut:]
+
+            parser.feed(ready)
+            offset += len(ready)
+            for event, elem in parser.read_events():
+                if event == 'start':
+                    stack.append(elem)
+                    continue
+                stack.pop()
+                if len(stack) != 1:
+                    continue
+                if elem.tag == 'submit' and elem.get('userId') is not None and elem.get('problemTitle') is not None:
+                    user_ids.append(elem.get('userId'))
+                    problems.append(elem.get('problemTitle'))
+                    scores.append(parse_score(elem.get('score')))
+                stack[0].clear()
+
+            if user_ids:
+                apply_live_submits(state, user_ids, problems, scores)
+                user_ids, problems, scores = [], [], []
+
+            if end != -1 or not block:
+                break
+
+        f.seek(max(offset - LIVE_ANCHOR_SIZE, 0))
+        state['anchor'] = f.read(offset - f.tell())
+
+    state['offset'] = offset
+
+
+def live_state_is_valid(xml_path, state):
+    """Состояние применимо, если обработанная часть файла не изменилась (лог только дописывался)"""
+    offset, anchor = state['offset'], state['anchor']
+    if os.path.getsize(xml_path) < offset:
+        return False
+    with open(xml_path, 'rb') as f:
+        # Список участников перед events сверяем по хэшу, обработанные события - по якорю
+        if hashlib.sha256(f.read(state['head_size'])).hexdigest() != state['head_sha256']:
+            return False
+        f.seek(offset - len(anchor))
+        return f.read(len(anchor)) == anchor
+
+
+def save_live_state(xml_path, state):
+    """Сохранение состояния инкрементального режима (.npz, атомарно)"""
+    n_users, n_problems = len(state['user_ids']), len(state['problems'])
+    arrays = {
+        'version': np.array(LIVE_STATE_VERSION),
+        'path': np.array(str(Path(xml_path).resolve())),
+        'offset': np.array(state['offset'], dtype=np.int64),
+        'anchor': np.frombuffer(state['anchor'], dtype=np.uint8),
+        'declaration': np.frombuffer(state['declaration'], dtype=np.uint8),
+        'head_size': np.array(state['head_size'], dtype=np.int64),
+        'head_sha256': np.array(state['head_sha256']),
+        'state_user_ids': np.array(list(state['user_ids']), dtype=str),
+        'state_problems': np.array(list(state['problems']), dtype=str),
+        'best': state['best'][:n_users, :n_problems],
+        **participants_to_arrays(state['participants'])
+    }
+    write_log_cache(live_state_path(xml_path), arrays)
+
+
+def load_live_state(xml_path):
+    """Загрузка сохранённого состояния; None, если его нет или оно от другого файла/формата"""
+    state_path = live_state_path(xml_path)
+    if not state_path.exists():
+        return None
+
+    with np.load(state_path, allow_pickle=False) as saved:
+        if int(saved['version']) != LIVE_STATE_VERSION or str(saved['path']) != str(Path(xml_path).resolve()):
+            return None
+        return {
+            'participants': participants_from_arrays(saved),
+            'declaration': saved['declaration'].tobytes(),
+            'head_size': int(saved['head_size']),
+            'head_sha256': str(saved['head_sha256']),
+            'offset': int(saved['offset']),
+            'anchor': saved['anchor'].tobytes(),
+            'user_ids': {uid: code for code, uid in enumerate(saved['state_user_ids'].tolist())},
+            'problems': {title: code for code, title in enumerate(saved['state_problems'].tolist())},
+            'best': saved['best'].copy()
+        }
+
+
+def refresh_live_state(xml_path, state=None):
+    """Дочитываем только новые события; без состояния или при переписанном логе - начинаем заново"""
+    if state is None or not live_state_is_valid(xml_path, state):
+        state = new_live_state(xml_path)
+
+    try:
+        read_new_submits(xml_path, state)
+    except ET.ParseError:
+        # Смещение указывает не на границу элемента - перечитываем лог целиком
+        state = new_live_state(xml_path)
+        read_new_submits(xml_path, state)
+    return state
+
+
+def update_live_state(xml_path):
+    """Инкрементальное обновление с сохранением состояния между запусками"""
+    try:
+        state = load_live_state(xml_path)
+    except Exception:
+        # Битый или недописанный файл состояния - начинаем с чистого состояния
+        state = None
+
+    state = refresh_live_state(xml_path, state)
+    try:
+        save_live_state(xml_path, state)
+    except OSError:
+        # Нет прав на запись рядом с логом - следующий запуск перечитает лог целиком
+        pass
+    return state
+
+
+def live_best_scores(state):
+    """Лучшие баллы из состояния в виде таблицы отправок (по одной строке на участника и задачу)"""
+    best = state['best'][:len(state['user_ids']), :len(state['problems'])]
+    rows, cols = np.nonzero(~np.isnan(best))
+    return pd.DataFrame({
+        'user_id': pd.Categorical.from_codes(rows, categories=list(state['user_ids'])),
+        'problem': pd.Categorical.from_codes(cols, categories=list(state['problems'])),
+        'score': best[rows, cols]
+    })
+
+
+def participants_frame(participants):
+    """Участники в виде таблицы с индексом по id (для векторных соединений)"""
+    return pd.DataFrame({
+        'name': [data['name'] for data in participants.values()],
+        'grade': [data['grade'] for data in participants.values()],
+        'municipality': [data['municipality'] for data in participants.values()]
+    }, index=list(participants.keys()))
+
+
+def problem_sort_key(title):
+    """Задачи по олимпиаде (префикс "олимпиада: " в объединённых логах), затем по номеру; нечисловые - в конце"""
+    contest, _, number = title.rpartition(': ')
+    return (contest, 0, int(number), '') if number.isdigit() else (contest, 1, 0, number)
+
+
+def best_score_matrix(submissions):
+    """Матрица лучших баллов участник × задача по целочисленным кодам (scatter-max, NaN - не сдавал)"""
+    user_codes = submissions['user_id'].cat.codes.to_numpy()
+    problem_codes = submissions['problem'].cat.codes.to_numpy()
+    valid = (user_codes >= 0) & (problem_codes >= 0)
+    user_codes, problem_codes = user_codes[valid], problem_codes[valid]
+
+    # Участники в порядке id, задачи - по номеру
+    user_labels = np.asarray(submissions['user_id'].cat.categories, dtype=str)
+    used_users = np.flatnonzero(np.bincount(user_codes, minlength=len(user_labels)))
+    used_users = used_users[np.argsort(user_labels[used_users], kind='stable')]
+
+    problem_labels = list(submissions['problem'].cat.categories)
+    used_problems = np.flatnonzero(np.bincount(problem_codes, minlength=len(problem_labels)))
+    used_problems = np.array(sorted(used_problems, key=lambda code: problem_sort_key(problem_labels[code])), dtype=np.intp)
+
+    # Перекодировка кодов категорий в номера строк и столбцов матрицы
+    user_rows = np.empty(len(user_labels), dtype=np.intp)
+    user_rows[used_users] = np.arange(len(used_users))
+    problem_cols = np.empty(len(problem_labels), dtype=np.intp)
+    problem_cols[used_problems] = np.arange(len(used_problems))
+
+    # Scatter-max по плоскому индексу ячейки (у ufunc.at для одномерного индекса быстрый путь)
+    best = np.full((len(used_users), len(used_problems)), np.nan, dtype=np.float64)
+    cells = user_rows[user_codes] * len(used_problems) + problem_cols[problem_codes]
+    np.fmax.at(best.reshape(-1), cells, submissions['score'].to_numpy(dtype=np.float64)[valid])
+
+    return user_labels[used_users], [problem_labels[code] for code in used_problems], best
+
+
+def standings_table(info, user_ids, problems, best, target_grade=None, target_municipality=None, with_user_id=False):
+    """Итоговая таблица по матрице лучших баллов для выбранного класса/муниципалитета"""
+    # Данные участников подтягиваем одним соединением по id
+    info = info.reindex(user_ids)
+    selected = info['name'].notna().to_numpy(copy=True)
+    if target_grade is not None:
+        selected &= (info['grade'] == target_grade).to_numpy()
+    if target_municipality is not None:
+        selected &= (info['municipality'] == target_municipality).to_numpy()
+
+    rows = np.flatnonzero(selected)
+    if not rows.size:
+        print("Нет данных для выбранных критериев фильтрации.")
+        return pd.DataFrame()
+
+    # Оставляем только задачи, которые сдавал кто-то из выбранных участников
+    scores = best[rows]
+    solved = ~np.isnan(scores).all(axis=0)
+    scores = np.nan_to_num(scores[:, solved], nan=0.0)
+    problem_columns = [problem for problem, keep in zip(problems, solved) if keep]
+    # Суммируем по задачам строго по порядку столбцов (как сумма строк в pandas): у дробных баллов
+    # порядок сложения влияет на последний знак, а от него - равенство итогов и места
+    totals = np.zeros(len(rows))
+    for column in scores.T:
+        totals += column
+
+    # Место с учетом совпадений баллов (как rank(method='min')): 1 + число участников с большим баллом
+    places = np.searchsorted(np.sort(-totals), -totals, side='left') + 1
+
+    table = {}
+    if with_user_id:
+        table['user_id'] = user_ids[rows]
+    table['Место'] = places
+    table['Участник'] = info['name'].to_numpy()[rows]
+    table['Класс'] = info['grade'].to_numpy()[rows]
+    table['Муниципалитет'] = info['municipality'].to_numpy()[rows]
+    for j, problem in enumerate(problem_columns):
+        table[str(problem)] = scores[:, j]
+    table['Итого'] = totals
+
+    # Сортируем по итоговому баллу (по убыванию) и сбрасываем индекс
+    df_final = pd.DataFrame(table).sort_values(by='Итого', ascending=False)
+    return df_final.reset_index(drop=True)
+
+
+def create_results_table(participants, submissions, target_grade=None, target_municipality=None, with_user_id=False):
+    """Создание итоговой таблицы результатов"""
+    user_ids, problems, best = best_score_matrix(submissions)
+    return standings_table(
+        participants_frame(participants), user_ids, problems, best,
+        target_grade=target_grade,
+        target_municipality=target_municipality,
+        with_user_id=with_user_id
+    )
+
+
+def grade_sort_key(grade):
+    """Классы по номеру, нечисловые значения - в конце"""
+    return (0, int(grade), '') if grade.isdigit() else (1, 0, grade)
+
+
+def standings_slices(participants, submissions):
+    """Итоговые таблицы всех срезов за один проход: общий, по классам, по муниципалитетам, класс × муниципалитет
+
+    Матрица лучших баллов и данные участников считаются один раз; в каждом срезе свои места.
+    Выдаёт по очереди (класс, муниципалитет, таблица), где None означает "все".
+    """
+    user_ids, problems, best = best_score_matrix(submissions)
+    info = participants_frame(participants).reindex(user_ids)
+
+    known = info.dropna()
+    grades = sorted(known['grade'].unique(), key=grade_sort_key)
+    municipalities = sorted(known['municipality'].unique())
+    pairs = sorted(set(zip(known['grade'], known['municipality'])),
+                   key=lambda pair: (grade_sort_key(pair[0]), pair[1]))
+
+    slices = [(None, None)]
+    slices += [(grade, None) for grade in grades]
+    slices += [(None, municipality) for municipality in municipalities]
+    slices += pairs
+
+    # Таблицы срезов отдаются по одной, чтобы в памяти не держать все сразу
+    for grade, municipality in slices:
+        yield grade, municipality, standings_table(info, user_ids, problems, best,
+                                                   target_grade=grade, target_municipality=municipality)
+
+
+def slice_label(grade, municipality, separator=', '):
+    """Подпись среза: "класс 9, Вологда", "Все участники" и т.п."""
+    parts = []
+    if grade is not None:
+        parts.append(f'класс {grade}')
+    if municipality is not None:
+        parts.append(municipality)
+    return separator.join(parts) if parts else 'Все участники'
+
+
+def slice_output_path(output, grade, municipality):
+    """Имя файла среза рядом с основным: results.csv -> results_класс 9_Вологда.csv"""
+    output = Path(output)
+    label = re.sub(r'[<>:"/\\|?*]', '_', slice_label(grade, municipality, separator='_'))
+    return output.with_name(f'{output.stem}_{label}{output.suffix}')
+
+
+def excel_sheet_name(label, used_names):
+    """Допустимое и уникальное имя листа Excel (до 31 символа, без []:*?/\\)"""
+    base = re.sub(r'[\[\]:*?/\\]', '_', label)[:31]
+    name, counter = base, 2
+    while name.lower() in used_names:
+        suffix = f' ({counter})'
+        name = base[:31 - len(suffix)] + suffix
+        counter += 1
+    used_names.add(name.lower())
+    return name
+
+
+def save_results_xlsx(tables, output_path):
+    """Экспорт таблиц в Excel по листу на таблицу; строки пишутся потоком (xlsxwriter, constant_memory)"""
+    try:
+        import xlsxwriter
+    except ImportError:
+        print("Для экспорта в Excel нужен пакет xlsxwriter: pip install xlsxwriter")
+        return False
+
+    workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+    header_format = workbook.add_format({'bold': True, 'bg_color': '#D9E1F2', 'border': 1})
+    formats = {
+        'Место': workbook.add_format({'num_format': '0'}),
+        'score': workbook.add_format({'num_format': '0.00'})
+    }
+    text_columns = {'Участник': 30, 'Класс': 10, 'Муниципалитет': 22}
+
+    used_names = set()
+    for label, df_table in tables:
+        worksheet = workbook.add_worksheet(excel_sheet_name(label, used_names))
+
+        # Ширина и формат столбцов задаются заранее: в потоковом режиме строки уже не переписать
+        for col, column in enumerate(df_table.columns):
+            if column in text_columns:
+                worksheet.set_column(col, col, text_columns[column])
+            else:
+                worksheet.set_column(col, col, 8 if column != 'Итого' else 10, formats.get(column, formats['score']))
+
+        # Закреплённая строка заголовка
+        worksheet.freeze_panes(1, 0)
+        worksheet.write_row(0, 0, [str(column) for column in df_table.columns], header_format)
+
+        # Строки пишутся по порядку и сразу сбрасываются на диск; дробные столбцы - как float64,
+        # иначе в ячейку попадает двоичное приближение float32 (33.29999923706055 вместо 33.3)
+        columns = [
+            df_table[column].to_numpy(dtype=np.float64).tolist() if df_table[column].dtype.kind == 'f'
+            else df_table[column].tolist()
+            for column in df_table.columns
+        ]
+        for row, values in enumerate(zip(*columns), start=1):
+            worksheet.write_row(row, 0, values)
+
+    workbook.close()
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Генерация итоговой таблицы олимпиады')
+    parser.add_argument('--xml', default='log.xml',
+                        help='Путь к XML файлу с логами (можно сжатому: .gz, .bz2, .xz, .zst), '
+                             'папке с логами или шаблону (tour*.xml) - логи объединяются в сезонную таблицу')
+    parser.add_argument('--output', default='results.csv',
+                        help='Путь для сохранения CSV файла (с расширением .xlsx - книга Excel)')
+    parser.add_argument('--grade', help='Фильтр по классу (например: 9, 10, 11)')
+    parser.add_argument('--municipality', help='Фильтр по муниципалитету')
+    parser.add_argument('--no-cache', action='store_true', help='Не использовать кэш разобранного XML')
+    parser.add_argument('--parser', choices=available_xml_backends(),
+                        help='Бэкенд разбора XML (по умолчанию самый быстрый из доступных)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Число процессов для разбора XML (по логу на процесс, '
+                             'а у единственного лога раздел events делится на куски)')
+    parser.add_argument('--live', action='store_true',
+                        help='Инкрементальный режим для растущего лога: дочитывать только новые отправки')
+    parser.add_argument('--all-slices', action='store_true',
+                        help='Сохранить таблицы всех срезов за один запуск: общую, по каждому классу, '
+                             'муниципалитету и паре класс-муниципалитет (фильтры не применяются)')
+
+    args = parser.parse_args(argv)
+    to_excel = Path(args.output).suffix.lower() == '.xlsx'
+    # Без xlsxwriter книгу не записать - сообщаем до разбора лога, а не после
+    if to_excel and importlib.util.find_spec('xlsxwriter') is None:
+        parser.error("для экспорта в Excel нужен пакет xlsxwriter: pip install xlsxwriter")
+
+    if args.live:
+        # Обновляем сохранённое состояние новыми событиями лога
+        state = update_live_state(args.xml)
+        participants, submissions = state['participants'], live_best_scores(state)
+    else:
+        # Парсим XML
+        participants, submissions = load_xml_logs(args.xml, use_cache=not args.no_cache,
+                                                  backend=args.parser, workers=args.workers)
+
+    if args.all_slices:
+        slices = standings_slices(participants, submissions)
+        if to_excel:
+            # Одна книга, по листу на срез
+            save_results_xlsx(((slice_label(grade, municipality), df_slice)
+                               for grade, municipality, df_slice in slices), args.output)
+            return
+        for grade, municipality, df_slice in slices:
+            df_slice.to_csv(slice_output_path(args.output, grade, municipality),
+                            sep=';', index=False, encoding='utf-8-sig')
+        return
+
+    # Создаем таблицу результатов
+    df_results = create_results_table(
+        participants,
+        submissions,
+        target_grade=args.grade,
+        target_municipality=args.municipality
+    )
+
+    if df_results.empty:
+        print("Таблица результатов пуста.")
+        return
+
+    if to_excel:
+        save_results_xlsx([(slice_label(args.grade, args.municipality), df_results)], args.output)
+        return
+
+    # Сохраняем в CSV с разделителем ';'
+    df_results.to_csv(args.output, sep=';', index=False, encoding='utf-8-sig')
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
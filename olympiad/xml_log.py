@@ -0,0 +1,337 @@
+"""Потоковый разбор XML лога олимпиады, в том числе сжатого (lxml и zstandard - необязательные зависимости)"""
+import re
+import bz2
+import gzip
+import lzma
+import mmap
+import contextlib
+import importlib.util
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+
+
+def parse_displayed_name(displayed_name):
+    """Разбор строки участника вида: Фамилия Имя, Класс, Муниципалитет"""
+    parts = [part.strip() for part in displayed_name.split(',')]
+
+    if len(parts) >= 3:
+        return {
+            'name': parts[0],
+            'grade': parts[1],
+            'municipality': parts[2]
+        }
+
+    return {
+        'name': displayed_name,
+        'grade': "Не указан",
+        'municipality': "Не указан"
+    }
+
+
+def parse_score(score_str):
+    """Баллы отправки (если нет или не число - 0)"""
+    if score_str is None or score_str == '':
+        return 0.0
+    try:
+        return float(score_str)
+    except ValueError:
+        return 0.0
+
+
+# Бэкенды разбора: каждый выдаёт записи (глубина, тег родителя, тег, атрибуты) для элементов с нужными
+# тегами (корень - глубина 0) и не держит в памяти уже разобранную часть документа
+XML_READ_BLOCK = 1 << 20
+
+
+# Сигнатуры сжатых логов: такой лог распаковывается потоком прямо в парсер, без копии на диске
+COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+
+
+def log_compression(xml_path):
+    """Формат сжатия лога по первым байтам файла (None - несжатый XML)"""
+    with open(xml_path, 'rb') as f:
+        head = f.read(6)
+    return next((name for magic, name in COMPRESSION_MAGIC if head.startswith(magic)), None)
+
+
+def open_zstd(xml_path):
+    """Потоковое чтение .zst: модуль стандартной библиотеки (Python 3.14+) или пакет zstandard"""
+    try:
+        from compression import zstd
+        return zstd.open(xml_path, 'rb')
+    except ImportError:
+        pass
+
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("Для чтения логов .zst нужен пакет zstandard: pip install zstandard") from None
+    return zstandard.ZstdDecompressor().stream_reader(open(xml_path, 'rb'), closefd=True, read_across_frames=True)
+
+
+DECOMPRESSORS = {
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open,
+    'zstd': open_zstd,
+}
+
+
+def open_log(xml_path):
+    """Файл лога для чтения в двоичном режиме; сжатый лог распаковывается на лету"""
+    compression = log_compression(xml_path)
+    if compression is None:
+        return open(xml_path, 'rb')
+    return DECOMPRESSORS[compression](xml_path)
+
+
+def open_xml_source(source):
+    """Источник XML для чтения: путь открывается через open_log, открытый файл используется как есть"""
+    if hasattr(source, 'read'):
+        return contextlib.nullcontext(source)
+    return open_log(source)
+
+
+def etree_records(xml_path, tags):
+    """Записи через ElementTree.iterparse"""
+    tags = frozenset(tags)
+    # Стек открытых элементов: обработанные элементы отцепляются от родителя
+    stack = []
+    with open_xml_source(xml_path) as f:
+        for event, elem in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            if elem.tag in tags:
+                yield len(stack), stack[-1].tag if stack else None, elem.tag, elem.attrib
+
+            if stack:
+                del stack[-1][:]
+
+
+def expat_records(xml_path, tags):
+    """Записи через pyexpat: элементы не создаются, атрибуты нужных тегов приходят сразу словарём"""
+    tags = frozenset(tags)
+    records = []
+    stack = []
+
+    def start(tag, attrs):
+        if tag in tags:
+            records.append((len(stack), stack[-1] if stack else None, tag, attrs))
+        stack.append(tag)
+
+    def end(tag):
+        stack.pop()
+
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+
+    try:
+        with open_xml_source(xml_path) as f:
+            while True:
+                block = f.read(XML_READ_BLOCK)
+                parser.Parse(block, not block)
+                yield from records
+                records.clear()
+                if not block:
+                    break
+    except expat.ExpatError as e:
+        # Ошибка того же типа, что и у остальных бэкендов
+        error = ET.ParseError(str(e))
+        error.code, error.position = e.code, (e.lineno, e.offset)
+        raise error from e
+
+
+def lxml_records(xml_path, tags):
+    """Записи через lxml.etree.iterparse (фильтрация тегов выполняется в libxml2)"""
+    from lxml import etree
+
+    with open_xml_source(xml_path) as f:
+        for event, elem in etree.iterparse(f, events=('end',), tag=tuple(tags),
+                                           resolve_entities=False, no_network=True):
+            parent = elem.getparent()
+            depth = 0
+            ancestor = parent
+            while ancestor is not None:
+                depth += 1
+                ancestor = ancestor.getparent()
+
+            yield depth, parent.tag if parent is not None else None, elem.tag, dict(elem.attrib)
+
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+XML_BACKENDS = {
+    'expat': expat_records,
+    'etree': etree_records,
+    'lxml': lxml_records,
+}
+
+# Порядок автоматического выбора - по замерам на логе из 300 тыс. отправок: pyexpat без создания
+# элементов быстрее всех, у lxml основное время уходит на перенос атрибутов в Python
+XML_BACKEND_PREFERENCE = ('expat', 'etree', 'lxml')
+
+
+def available_xml_backends():
+    """Бэкенды, доступные в текущем окружении (lxml - только если установлен)"""
+    return [name for name in XML_BACKEND_PREFERENCE
+            if name != 'lxml' or importlib.util.find_spec('lxml') is not None]
+
+
+def xml_records(xml_path, tags, backend=None):
+    """Записи нужных тегов из XML через выбранный или самый быстрый доступный бэкенд"""
+    if backend is None:
+        backend = available_xml_backends()[0]
+    elif backend not in available_xml_backends():
+        raise ValueError(f"Бэкенд разбора XML недоступен: {backend}")
+    return XML_BACKENDS[backend](xml_path, tags)
+
+
+def log_entries(records, depth):
+    """Участники и отправки из записей бэкенда (depth - глубина элементов user и submit)"""
+    for record_depth, section, tag, attrs in records:
+        # Нас интересуют только записи внутри разделов users и events
+        if record_depth != depth:
+            continue
+
+        if section == 'users' and tag == 'user':
+            yield 'user', (attrs.get('id'), parse_displayed_name(attrs.get('displayedName')))
+        elif section == 'events' and tag == 'submit':
+            yield 'submit', (
+                attrs.get('userId'),
+                attrs.get('problemTitle'),
+                attrs.get('languageId'),
+                parse_score(attrs.get('score'))
+            )
+
+
+def iter_xml_log(xml_path, backend=None):
+    """Потоковый разбор XML: по одному выдаёт участников и отправки, не держа всё дерево в памяти"""
+    return log_entries(xml_records(xml_path, ('user', 'submit'), backend), 2)
+
+
+# Параллельный разбор: содержимое раздела events режется на куски по началам элементов submit
+# (в значениях атрибутов и тексте "<" всегда экранирован, так что граница не попадает внутрь элемента),
+# каждый кусок разбирается отдельно как документ с собственным корнем <events>.
+# Куски меньше PARALLEL_MIN_CHUNK не выделяются - запуск процесса дороже их разбора
+PARALLEL_MIN_CHUNK = 4 << 20
+
+EVENTS_OPEN = re.compile(rb'<events[\s>/]')
+EVENTS_CLOSE = b'</events>'
+SUBMIT_OPEN = re.compile(rb'<submit[\s>/]')
+
+
+class LogSlice:
+    """Файлоподобный объект: склейка байтовых строк и диапазонов (начало, конец) файла лога"""
+
+    def __init__(self, xml_path, pieces):
+        self.file = open(xml_path, 'rb')
+        self.pieces = list(reversed(pieces))
+
+    def read(self, size=-1):
+        # Куски хранятся в обратном порядке: текущий - последний в списке
+        while self.pieces:
+            piece = self.pieces.pop()
+            if isinstance(piece, bytes):
+                data = piece if size < 0 else piece[:size]
+                if len(data) < len(piece):
+                    self.pieces.append(piece[len(data):])
+            else:
+                start, end = piece
+                self.file.seek(start)
+                data = self.file.read(end - start if size < 0 else min(size, end - start))
+                if data and start + len(data) < end:
+                    self.pieces.append((start + len(data), end))
+            if data:
+                return data
+        return b''
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def split_events(xml_path, parts, min_chunk=PARALLEL_MIN_CHUNK):
+    """Разметка лога для параллельного разбора: (декларация, вне events, куски events).
+
+    "Вне events" - диапазоны байтов до раздела events и после него: вместе они образуют корректный
+    документ с участниками. Куски - диапазоны содержимого events, режутся перед элементами submit.
+    None, если раздела events нет, лог слишком мал, чтобы делить его на части, или сжат
+    (сжатый поток по смещениям не режется - такой лог разбирается последовательно).
+    """
+    if log_compression(xml_path) is not None:
+        return None
+
+    with open(xml_path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Пустой файл не отображается в память
+            return None
+
+        with data:
+            match = EVENTS_OPEN.search(data)
+            if match is None:
+                return None
+            # Пустой раздел (<events/>) делить нечего
+            tag_end = data.find(b'>', match.start())
+            if tag_end == -1 or data[tag_end - 1:tag_end] == b'/':
+                return None
+            start = tag_end + 1
+            end = data.find(EVENTS_CLOSE, start)
+            if end == -1:
+                return None
+
+            parts = min(parts, (end - start) // min_chunk)
+            if parts < 2:
+                return None
+
+            bounds = [start]
+            for part in range(1, parts):
+                submit = SUBMIT_OPEN.search(data, max(bounds[-1] + 1, start + (end - start) * part // parts), end)
+                if submit is None:
+                    break
+                bounds.append(submit.start())
+            bounds.append(end)
+
+            declaration = data[:data.find(b'?>') + 2] if data[:5] == b'<?xml' else b''
+            outside = [(0, match.start()), (end + len(EVENTS_CLOSE), len(data))]
+
+    return declaration, outside, list(zip(bounds, bounds[1:]))
+
+
+def events_chunk_records(xml_path, declaration, start, end, tags, backend=None):
+    """Записи нужных тегов из куска раздела events (кусок оборачивается в собственный корень <events>)"""
+    with LogSlice(xml_path, [declaration + b'<events>', (start, end), EVENTS_CLOSE]) as source:
+        yield from xml_records(source, tags, backend)
+
+
+def iter_events_chunk(xml_path, declaration, start, end, backend=None):
+    """Разбор куска раздела events: отправки в том же виде, что и в iter_xml_log"""
+    return log_entries(events_chunk_records(xml_path, declaration, start, end, ('submit',), backend), 1)
+
+
+def outside_events_records(xml_path, outside, tags, backend=None):
+    """Записи нужных тегов из лога без первого раздела events"""
+    with LogSlice(xml_path, outside) as source:
+        yield from xml_records(source, tags, backend)
+
+
+def iter_outside_events(xml_path, outside, backend=None):
+    """Разбор лога без первого раздела events: участники (и отправки других разделов events, если есть)"""
+    return log_entries(outside_events_records(xml_path, outside, ('user', 'submit'), backend), 2)
@@ -0,0 +1,5 @@
+"""HTTP сервер живой итоговой таблицы (то же, что python -m olympiad serve)"""
+from olympiad.cli import run
+
+if __name__ == "__main__":
+    run('serve')
@@ -0,0 +1,83 @@
+"""Поиск похожих решений разных участников: кандидаты MinHash/LSH против полного перебора пар"""
+import itertools
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from olympiad.plagiarism import (analyze_problem_cross_users, levenshtein_distance, load_sequence,
+                                 CROSS_SIMILARITY)
+
+WORDS = ['for', 'i', 'in', 'range', '(', ')', ':', 'print', 'x', '=', '+', '1', 'if', 'while', 'return',
+         'def', 'solve', 'n', 'a', 'b', '\n', '    ', 'int', ';', '{', '}', 'cin', '>>', 'cout', '<<']
+
+
+def random_text(rng, length):
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def mutate(rng, text, edits):
+    """Случайные вставки, удаления и замены символов, разбросанные по тексту"""
+    text = list(text)
+    for _ in range(edits):
+        action, position = rng.random(), rng.randrange(len(text) + 1)
+        if action < 0.4:
+            text.insert(position, rng.choice('abcxyz ();\n'))
+        elif action < 0.7 and text:
+            text.pop(min(position, len(text) - 1))
+        elif text:
+            text[min(position, len(text) - 1)] = rng.choice('qwe')
+    return ''.join(text)
+
+
+class CrossUsersTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_entries(self, seed):
+        """Группы списанных решений (исходник и копии с правками до 25% длины) вперемешку с оригинальными"""
+        rng = random.Random(seed)
+        texts = []
+        for _ in range(30):
+            original = random_text(rng, rng.randint(40, 300))
+            texts.append(original)
+            texts.extend(mutate(rng, original, int(len(original) * rng.uniform(0, 0.25)))
+                         for _ in range(rng.randint(0, 4)))
+
+        entries = []
+        for number, text in enumerate(texts):
+            path = os.path.join(self.directory.name, f'{seed}_{number}.py')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            entries.append((f'u{number}', str(number), path, 'python3'))
+        return entries
+
+    def test_recall_against_brute_force(self):
+        for seed in (1, 2, 3):
+            entries = self.make_entries(seed)
+            sources = [load_sequence(path, language, False)[1] for user_id, submission_id, path, language in entries]
+
+            expected = set()
+            for i, j in itertools.combinations(range(len(entries)), 2):
+                max_distance = int((1 - CROSS_SIMILARITY) * max(len(sources[i]), len(sources[j])))
+                if levenshtein_distance(sources[i], sources[j], max_distance) <= max_distance:
+                    expected.add((entries[i][1], entries[j][1]))
+
+            results, candidate_count = analyze_problem_cross_users('1', entries)
+            found = {(result['sub_a'], result['sub_b']) for result in results}
+
+            # Точное расстояние считается для каждого кандидата - лишних пар нет
+            self.assertLessEqual(found, expected)
+            # Пропущенные пары - только из-за LSH, и их немного; кандидатов - малая доля всех пар
+            self.assertGreaterEqual(len(found), 0.75 * len(expected), seed)
+            self.assertLess(candidate_count, 0.05 * len(entries) * (len(entries) - 1) / 2, seed)
+
+
+if __name__ == '__main__':
+    unittest.main()
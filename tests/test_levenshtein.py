@@ -0,0 +1,80 @@
+"""Битово-параллельное расстояние Левенштейна против эталонного динамического программирования"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from olympiad.plagiarism import levenshtein_distance
+
+
+def reference_distance(s1, s2):
+    """Классическое ДП по строкам матрицы (как в исходной версии скрипта)"""
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            current_row.append(min(previous_row[j + 1] + 1, current_row[j] + 1, previous_row[j] + (c1 != c2)))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def random_pair(rng, alphabet, max_length):
+    """Пара похожих последовательностей: вторая получается из первой случайными правками"""
+    s1 = [rng.choice(alphabet) for _ in range(rng.randint(0, max_length))]
+    s2 = list(s1)
+    for _ in range(rng.randint(0, 8)):
+        position = rng.randint(0, len(s2))
+        action = rng.randrange(3)
+        if action == 0:
+            s2.insert(position, rng.choice(alphabet))
+        elif s2 and position < len(s2):
+            if action == 1:
+                del s2[position]
+            else:
+                s2[position] = rng.choice(alphabet)
+    if rng.random() < 0.2:
+        s2 = [rng.choice(alphabet) for _ in range(rng.randint(0, max_length))]
+    return s1, s2
+
+
+class LevenshteinDistanceTest(unittest.TestCase):
+    def test_matches_reference_on_strings(self):
+        rng = random.Random(13)
+        # Длины больше 64 проверяют многословные битовые векторы
+        for _ in range(400):
+            s1, s2 = random_pair(rng, 'abc \n{}', 150)
+            s1, s2 = ''.join(s1), ''.join(s2)
+            self.assertEqual(levenshtein_distance(s1, s2), reference_distance(s1, s2), (s1, s2))
+
+    def test_matches_reference_on_token_sequences(self):
+        rng = random.Random(18)
+        for _ in range(200):
+            s1, s2 = random_pair(rng, range(5), 100)
+            s1, s2 = tuple(s1), tuple(s2)
+            self.assertEqual(levenshtein_distance(s1, s2), reference_distance(s1, s2), (s1, s2))
+
+    def test_bounded_mode(self):
+        rng = random.Random(42)
+        for _ in range(400):
+            s1, s2 = random_pair(rng, 'abcd', 120)
+            s1, s2 = ''.join(s1), ''.join(s2)
+            expected = reference_distance(s1, s2)
+            max_distance = rng.randint(0, 20)
+            # Не больше порога - точное значение, иначе ровно max_distance + 1
+            self.assertEqual(levenshtein_distance(s1, s2, max_distance),
+                             expected if expected <= max_distance else max_distance + 1,
+                             (s1, s2, max_distance))
+
+    def test_edge_cases(self):
+        self.assertEqual(levenshtein_distance('', ''), 0)
+        self.assertEqual(levenshtein_distance('', 'abc'), 3)
+        self.assertEqual(levenshtein_distance('abc', ''), 3)
+        self.assertEqual(levenshtein_distance('kitten', 'sitting'), 3)
+        self.assertEqual(levenshtein_distance('abc', 'abc', 0), 0)
+        self.assertEqual(levenshtein_distance('abc', 'abcdef', 1), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Инкрементальный режим: дочитывание дописываемого лога против полного разбора"""
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from olympiad import standings
+from olympiad.log_table import parse_xml_log
+
+HEAD = ('<?xml version="1.0" encoding="utf-8"?>\n<contestLog>\n<users>\n'
+        '<user id="1" displayedName="Иванов Иван, 9, Вологда"/>\n'
+        '<user id="2" displayedName="Петров Пётр, 10, Череповец"/>\n'
+        '</users>\n<events>\n').encode('utf-8')
+TAIL = b'</events>\n</contestLog>\n'
+
+
+def best_scores_dict(best):
+    """Лучшие баллы в виде словаря (участник, задача) -> балл"""
+    return {(str(uid), str(problem)): score
+            for uid, problem, score in zip(best['user_id'], best['problem'], best['score'])}
+
+
+class LiveStateTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'log.xml')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def assert_matches_full_parse(self, state):
+        participants, submissions = parse_xml_log(self.path)
+        self.assertEqual(state['participants'], participants)
+        best = submissions.groupby(['user_id', 'problem'], as_index=False, observed=True)['score'].max()
+        self.assertEqual(best_scores_dict(standings.live_best_scores(state)), best_scores_dict(best))
+
+    def test_gt_inside_attribute_of_partial_submit(self):
+        complete = HEAD + b'<submit userId="1" problemTitle="1" score="3"/>\n'
+        # Отправка дописана не до конца, а в её атрибуте есть ">"
+        self.write(complete + b'<submit userId="1" problemTitle="3" score="5" note="x>')
+        state = standings.update_live_state(self.path)
+        self.assertEqual(state['offset'], len(complete))
+
+        self.write(complete + b'<submit userId="1" problemTitle="3" score="5" note="x>y"/>\n' + TAIL)
+        state = standings.update_live_state(self.path)
+        self.assertEqual(best_scores_dict(standings.live_best_scores(state)), {('1', '1'): 3.0, ('1', '3'): 5.0})
+        self.assert_matches_full_parse(state)
+
+    def test_partial_writes(self):
+        rng = random.Random(4)
+        events = b''.join(
+            b'<submit userId="%d" problemTitle="%d" languageId="%d" score="%s" note=\'a>b\'/>\n'
+            % (rng.randint(1, 2), rng.randint(1, 5), rng.randint(1, 3), str(rng.randint(0, 100) / 4).encode())
+            for _ in range(300))
+        full = HEAD + events + TAIL
+
+        # Допустимые смещения - конец заголовка и концы элементов (или следующих за ними переводов строк)
+        boundaries = {len(HEAD)} | {i + 2 for i in range(len(full)) if full[i:i + 2] == b'/>'} \
+            | {i + 1 for i in range(len(full)) if full[i:i + 1] == b'\n'}
+
+        # Маленький блок чтения - границы блоков тоже попадают внутрь элементов
+        block_size = standings.LIVE_READ_BLOCK
+        standings.LIVE_READ_BLOCK = 97
+        try:
+            for cut in sorted(rng.sample(range(len(HEAD), len(full)), 25)) + [len(full)]:
+                self.write(full[:cut])
+                state = standings.update_live_state(self.path)
+                # Обработанная часть всегда заканчивается на границе элемента
+                self.assertIn(state['offset'], boundaries)
+        finally:
+            standings.LIVE_READ_BLOCK = block_size
+        self.assert_matches_full_parse(state)
+
+
+    def test_broken_state_is_a_miss(self):
+        self.write(HEAD + b'<submit userId="2" problemTitle="1" score="4"/>\n' + TAIL)
+        standings.update_live_state(self.path)
+        for broken in (b'', b'junk', standings.live_state_path(self.path).read_bytes()[:100]):
+            standings.live_state_path(self.path).write_bytes(broken)
+            state = standings.update_live_state(self.path)
+            self.assertEqual(best_scores_dict(standings.live_best_scores(state)), {('2', '1'): 4.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Объединение логов нескольких олимпиад, в том числе логов без отправок и без languageId"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from olympiad.log_table import load_xml_log, load_xml_logs, log_cache_path
+
+LOGS = {
+    'tour1.xml': '<submit userId="1" problemTitle="1" languageId="2" score="10"/>'
+                 '<submit userId="2" problemTitle="2" languageId="3" score="7.5"/>',
+    # Отправок нет - все словари категорий пустые
+    'tour2.xml': '',
+    # Нет languageId - пустой словарь языков
+    'tour3.xml': '<submit userId="2" problemTitle="1" score="4"/>',
+}
+
+
+def write_log(path, events):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<contestLog><users>'
+                '<user id="1" displayedName="Иванов Иван, 9, Вологда"/>'
+                '<user id="2" displayedName="Петров Пётр, 10, Череповец"/>'
+                f'</users><events>{events}</events></contestLog>\n')
+
+
+class MergeLogsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for name, events in LOGS.items():
+            write_log(os.path.join(self.directory.name, name), events)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_logs_without_submits_or_languages(self):
+        # Второй проход читает те же логи из кэша
+        for use_cache in (False, True, True):
+            participants, submissions = load_xml_logs(self.directory.name, use_cache=use_cache)
+            self.assertEqual(set(participants), {'1', '2'})
+            self.assertEqual(submissions['contest'].tolist(), ['tour1', 'tour1', 'tour3'])
+            self.assertEqual(submissions['problem'].tolist(), ['tour1: 1', 'tour1: 2', 'tour3: 1'])
+            self.assertEqual(submissions['language_id'].tolist()[:2], ['2', '3'])
+            self.assertTrue(submissions['language_id'].isna().tolist()[2])
+            self.assertEqual(submissions['score'].tolist(), [10.0, 7.5, 4.0])
+
+    def test_broken_cache_is_a_miss(self):
+        path = os.path.join(self.directory.name, 'tour1.xml')
+        expected = load_xml_log(path)
+        cache_path = log_cache_path(path)
+        data = cache_path.read_bytes()
+        # Обрезанный, пустой и вовсе не zip файл кэша
+        for broken in (data[:len(data) // 2], b'', b'junk'):
+            cache_path.write_bytes(broken)
+            participants, submissions = load_xml_log(path)
+            self.assertEqual(participants, expected[0])
+            self.assertTrue(submissions.equals(expected[1]))
+        # Кэш перезаписан целым, временных файлов не осталось
+        self.assertGreater(cache_path.stat().st_size, len(b'junk'))
+        self.assertFalse([name for name in os.listdir(self.directory.name) if name.endswith('.tmp')])
+
+
+if __name__ == '__main__':
+    unittest.main()